@@ -0,0 +1 @@
+"""Offline benchmarks for the meal planner's hot paths."""
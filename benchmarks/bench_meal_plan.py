@@ -0,0 +1,62 @@
+"""
+Round-trip check and timing target for MealPlan.from_dataframe / to_dataframe.
+
+For each plan size the script checks that from_dataframe(df).to_dataframe()
+reproduces the (date, num_days, meal_type, recipe_id) rows of a shuffled plan
+frame, that a second round trip yields an equal MealPlan, and that the input
+frame is left unmodified. It then times both conversions and exits non-zero if
+either exceeds --target-ms at the largest size.
+
+    python -m benchmarks.bench_meal_plan --days 7,28,365 --per-slot 10
+"""
+import argparse
+import sys
+
+import pandas as pd
+
+from benchmarks.bench_parser import best_of
+from benchmarks.run import _int_list, make_meal_plan_frame
+from models.meal_plan import MealPlan
+
+KEY = ['date', 'meal_type', 'recipe_id']
+
+
+def check_round_trip(df: pd.DataFrame) -> None:
+    original = df.copy()
+    plan = MealPlan.from_dataframe(df)
+    restored = plan.to_dataframe()
+
+    expected = df[['date', 'num_days', 'meal_type', 'recipe_id']].sort_values(KEY, kind='stable').reset_index(drop=True)
+    actual = restored.sort_values(KEY, kind='stable').reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    pd.testing.assert_frame_equal(df, original)
+    assert MealPlan.from_dataframe(restored) == plan, "second round trip differs"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=_int_list, default=[7, 28, 365])
+    parser.add_argument("--per-slot", type=int, default=10, help="Recipes per day and meal type")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=50.0, help="Time budget per conversion at the largest size")
+    args = parser.parse_args()
+
+    over_budget = False
+    for num_days in args.days:
+        df = make_meal_plan_frame(num_days, args.per_slot, list(range(1, 5001)))
+        df = df.sample(frac=1, random_state=num_days).reset_index(drop=True)
+        check_round_trip(df)
+
+        plan = MealPlan.from_dataframe(df)
+        from_ms = best_of(lambda: MealPlan.from_dataframe(df), args.repeat) * 1000
+        to_ms = best_of(plan.to_dataframe, args.repeat) * 1000
+        print(f"days={num_days:<4} entries={len(df):<7} round trip ok  "
+              f"from_dataframe {from_ms:8.2f} ms  to_dataframe {to_ms:8.2f} ms")
+        if num_days == max(args.days) and max(from_ms, to_ms) > args.target_ms:
+            print(f"Over the {args.target_ms:.0f} ms target")
+            over_budget = True
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
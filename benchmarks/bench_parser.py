@@ -0,0 +1,126 @@
+"""
+Benchmark SpoonacularAPI.parse_recipe_data against the original row-wise parser.
+
+Both parsers run on the same synthetic payload. The script checks that they
+produce identical DataFrames, then reports the best-of-N time for each.
+
+    python -m benchmarks.bench_parser --recipes 1000 --ingredients 12
+"""
+import argparse
+import time
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from benchmarks.payloads import make_complex_search_results, make_sparse_search_results
+from services.cache import SearchCache
+from services.spoonacular import SpoonacularAPI
+
+
+def find_nutrient(nutrients: List[Dict], nutrient_name: str) -> float:
+    for nutrient in nutrients:
+        if nutrient.get('name', '').lower() == nutrient_name.lower():
+            return nutrient.get('amount', 0)
+    return 0.0
+
+
+def parse_recipe_data_rowwise(recipes_data: List[Dict]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """The original per-row parser, kept as the reference output."""
+    if not recipes_data:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+    recipes_list, ingredients_list, nutrition_list = [], [], []
+    for recipe in recipes_data:
+        recipes_list.append({
+            'recipe_id': recipe['id'],
+            'name': recipe['title'],
+            'servings': recipe['servings'],
+            'prep_time': recipe.get('readyInMinutes', 0),
+            'total_cost': recipe.get('pricePerServing', 0) * recipe['servings'],
+            'source_url': recipe.get('sourceUrl', ''),
+            'image_url': recipe.get('image', '')
+        })
+        for ingredient in recipe['extendedIngredients']:
+            ingredients_list.append({
+                'recipe_id': recipe['id'],
+                'ingredient_id': ingredient.get('id', 0),
+                'name': ingredient.get('name', ''),
+                'amount': ingredient.get('amount', 0),
+                'unit': ingredient.get('unit', ''),
+                'original_string': ingredient.get('original', ''),
+                'aisle': ingredient.get('aisle', '')
+            })
+        if 'nutrition' in recipe:
+            nutrients = recipe['nutrition'].get('nutrients', [])
+            nutrition_list.append({
+                'recipe_id': recipe['id'],
+                'calories': find_nutrient(nutrients, 'Calories'),
+                'protein': find_nutrient(nutrients, 'Protein'),
+                'carbs': find_nutrient(nutrients, 'Carbohydrates'),
+                'fat': find_nutrient(nutrients, 'Fat'),
+                'fiber': find_nutrient(nutrients, 'Fiber'),
+                'sugar': find_nutrient(nutrients, 'Sugar'),
+                'sodium': find_nutrient(nutrients, 'Sodium'),
+                'cholesterol': find_nutrient(nutrients, 'Cholesterol')
+            })
+
+    recipes_df = pd.DataFrame(recipes_list)
+    ingredients_df = pd.DataFrame(ingredients_list)
+    nutrition_df = pd.DataFrame(nutrition_list)
+    if not recipes_df.empty:
+        recipes_df.set_index('recipe_id', inplace=True)
+    if not nutrition_df.empty:
+        nutrition_df.set_index('recipe_id', inplace=True)
+    return recipes_df, ingredients_df, nutrition_df
+
+
+def expected_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """The row-wise output with ingredient_id as the nullable Int64 the columnar parser returns."""
+    if 'ingredient_id' in df:
+        df = df.assign(ingredient_id=df['ingredient_id'].astype('Int64'))
+    return df
+
+
+def offline_api() -> SpoonacularAPI:
+    """A client that never touches the network or the on-disk search cache."""
+    return SpoonacularAPI(api_key="offline-benchmark", cache=SearchCache(":memory:"))
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    """Fastest of `repeat` timed calls to `func`, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--ingredients", type=int, default=12, help="Average ingredients per recipe")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = make_complex_search_results(args.recipes, args.ingredients)
+    api = offline_api()
+
+    for expected, actual in zip(parse_recipe_data_rowwise(payload), api.parse_recipe_data(payload)):
+        pd.testing.assert_frame_equal(actual, expected_dtypes(expected))
+
+    # The row-wise parser fails on null servings, so it only sees the recipes the columnar one keeps
+    sparse = make_sparse_search_results(args.recipes, args.ingredients)
+    kept = [recipe for recipe in sparse if recipe['servings'] is not None]
+    for expected, actual in zip(parse_recipe_data_rowwise(kept), api.parse_recipe_data(sparse)):
+        pd.testing.assert_frame_equal(actual, expected_dtypes(expected))
+
+    rowwise = best_of(lambda: parse_recipe_data_rowwise(payload), args.repeat)
+    columnar = best_of(lambda: api.parse_recipe_data(payload), args.repeat)
+    print(f"recipes={args.recipes} ingredients~{args.ingredients} outputs identical")
+    print(f"row-wise : {rowwise * 1000:9.2f} ms")
+    print(f"columnar : {columnar * 1000:9.2f} ms  ({rowwise / columnar:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
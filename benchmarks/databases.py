@@ -0,0 +1,101 @@
+"""Pre-populated meal_prep.db files for offline benchmarks."""
+import os
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Iterator
+
+from benchmarks.payloads import AISLES, INGREDIENT_NAMES, UNITS
+from services.database import Database
+
+PANTRY_UNITS = ["g", "kg", "ml", "l", "pieces"]
+
+
+def _pantry_rows(count: int, rng: random.Random) -> Iterator[SimpleNamespace]:
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(count):
+        yield SimpleNamespace(
+            ingredient_id=None,
+            name=rng.choice(INGREDIENT_NAMES).title(),
+            amount=round(rng.uniform(0.1, 2000), 2),
+            unit=rng.choice(PANTRY_UNITS),
+            expiry_date=today + timedelta(days=rng.randint(-5, 60)),
+            original_string=None,
+            aisle=None,
+            recipe_id=None
+        )
+
+
+def _recipe_rows(count: int, num_recipes: int, rng: random.Random) -> Iterator[SimpleNamespace]:
+    for _ in range(count):
+        name = rng.choice(INGREDIENT_NAMES)
+        amount = round(rng.uniform(0.25, 500), 2)
+        unit = rng.choice(UNITS)
+        yield SimpleNamespace(
+            ingredient_id=INGREDIENT_NAMES.index(name) + 1000,
+            name=name,
+            amount=amount,
+            unit=unit,
+            expiry_date=None,
+            original_string=f"{amount} {unit} {name}".strip(),
+            aisle=rng.choice(AISLES),
+            recipe_id=rng.randint(1, num_recipes)
+        )
+
+
+def populate_database(path: str, num_rows: int, pantry_fraction: float = 0.2, seed: int = 0) -> Database:
+    """
+    Create a fresh database at `path` holding `num_rows` ingredient rows.
+
+    Roughly `pantry_fraction` of the rows are pantry items with expiry dates; the
+    rest are recipe ingredients spread over num_rows // 10 recipes, each of which
+    also gets a recipes and nutrition row. A handful of meal plans is added too.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(seed)
+    db = Database(path)
+
+    num_pantry = int(num_rows * pantry_fraction)
+    num_recipes = max(1, num_rows // 10)
+    with db.transaction():
+        db.add_recipes(
+            SimpleNamespace(
+                recipe_id=recipe_id,
+                recipe_name=f"Synthetic Recipe {recipe_id}",
+                source_url=f"https://example.com/recipes/{recipe_id}",
+                total_cost=round(rng.uniform(1, 40), 2),
+                prep_time=rng.randint(5, 120),
+                image_url="",
+                servings=rng.randint(1, 8)
+            )
+            for recipe_id in range(1, num_recipes + 1)
+        )
+        db.add_nutrition_rows(
+            SimpleNamespace(
+                recipe_id=recipe_id,
+                calories=rng.uniform(100, 1200),
+                protein=rng.uniform(0, 80),
+                carbs=rng.uniform(0, 150),
+                fat=rng.uniform(0, 70),
+                fiber=rng.uniform(0, 20),
+                cholesterol=rng.uniform(0, 300),
+                sodium=rng.uniform(0, 2500)
+            )
+            for recipe_id in range(1, num_recipes + 1)
+        )
+        db.add_ingredients(_pantry_rows(num_pantry, rng))
+        db.add_ingredients(_recipe_rows(num_rows - num_pantry, num_recipes, rng))
+
+        for plan in range(min(50, num_recipes)):
+            start = datetime(2024, 1, 1) + timedelta(days=7 * plan)
+            db.add_meal_plan(SimpleNamespace(
+                start_date=start.strftime('%Y-%m-%d'),
+                num_days=7,
+                breakfast=[[rng.randint(1, num_recipes)] for _ in range(7)],
+                lunch=[[rng.randint(1, num_recipes)] for _ in range(7)],
+                dinner=[[rng.randint(1, num_recipes)] for _ in range(7)]
+            ))
+    with db.transaction() as conn:
+        conn.execute('ANALYZE')
+    return db
@@ -0,0 +1,123 @@
+"""
+Cold-start import budget for the Streamlit pages.
+
+Runs each page's top-level imports in a fresh interpreter under `python -X importtime`,
+reports the cumulative import time and the heaviest modules, and with --check fails
+when a page exceeds its budget or loads a dependency it is meant to defer.
+
+    python -m benchmarks.importtime               # report
+    python -m benchmarks.importtime --check       # exit 1 on a budget violation
+    python -m benchmarks.importtime --repeat 5    # best of 5 cold starts per page
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed per page, in milliseconds, over the cost of `import streamlit`
+IMPORT_BUDGET_MS: Dict[str, float] = {
+    'Home.py': 150.0,
+    'pages/1_🗄️_Fridge_Inventory_Management.py': 600.0,
+    'pages/2_📝_Meal_Planning.py': 900.0,
+    'pages/3_👤_User_Dashboard.py': 150.0,
+}
+
+# Heavy modules a page must not load at import time; they belong in the code paths that use them
+DEFERRED_MODULES: Dict[str, List[str]] = {
+    'Home.py': ['pandas', 'numpy', 'requests', 'dotenv'],
+    'pages/1_🗄️_Fridge_Inventory_Management.py': ['requests', 'dotenv'],
+    'pages/2_📝_Meal_Planning.py': ['dotenv'],
+    'pages/3_👤_User_Dashboard.py': ['pandas', 'numpy', 'requests', 'dotenv'],
+}
+
+
+def import_statements(path: str) -> str:
+    """The top-level import statements of a page script, as source."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Parse `-X importtime` output into (module, depth, self_us, cumulative_us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(source: str, baseline: str = 'import streamlit') -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """
+    Import `source` in a fresh interpreter after `baseline`, returning the cumulative
+    milliseconds spent on imports beyond the baseline and the parsed importtime rows.
+    """
+    code = f"{baseline}\nimport sys\nsys.stderr.write('--- page imports ---\\n')\n{source}\n"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, 'PYTHONPATH': ROOT, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    page_stderr = result.stderr.split('--- page imports ---\n', 1)[1]
+    rows = parse_importtime(page_stderr)
+    total_us = sum(cumulative for _, depth, _, cumulative in rows if depth == 0)
+    return total_us / 1000, rows
+
+
+def check_page(page: str, repeat: int) -> Dict:
+    source = import_statements(os.path.join(ROOT, page))
+    runs = [measure(source) for _ in range(repeat)]
+    milliseconds, rows = min(runs, key=lambda run: run[0])
+    loaded = {name for name, _, _, _ in rows}
+    heaviest = sorted((row for row in rows if row[1] == 0), key=lambda row: -row[3])[:5]
+    return {
+        'page': page,
+        'milliseconds': milliseconds,
+        'budget': IMPORT_BUDGET_MS.get(page),
+        'deferred_loaded': [module for module in DEFERRED_MODULES.get(page, []) if module in loaded],
+        'heaviest': [(name, cumulative / 1000) for name, _, _, cumulative in heaviest],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when a page breaks its budget")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts per page; the fastest is kept")
+    parser.add_argument("pages", nargs="*", default=list(IMPORT_BUDGET_MS), help="Page scripts relative to the repo root")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for page in args.pages:
+        report = check_page(page, args.repeat)
+        budget = report['budget']
+        status = "ok"
+        if budget is not None and report['milliseconds'] > budget:
+            status = "OVER BUDGET"
+            failures.append(f"{page}: {report['milliseconds']:.0f} ms > {budget:.0f} ms")
+        if report['deferred_loaded']:
+            status = "LOADS DEFERRED MODULES"
+            failures.append(f"{page}: imports {', '.join(report['deferred_loaded'])} at load time")
+        budget_text = f"{budget:.0f} ms" if budget is not None else "none"
+        print(f"{page:<50} {report['milliseconds']:8.1f} ms  (budget {budget_text})  {status}")
+        for name, milliseconds in report['heaviest']:
+            print(f"    {name:<46} {milliseconds:8.1f} ms")
+
+    if failures:
+        print("\nImport budget violations:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1 if args.check else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
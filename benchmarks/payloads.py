@@ -0,0 +1,77 @@
+"""Synthetic Spoonacular complexSearch payloads for offline benchmarks."""
+import random
+from typing import Dict, List
+
+INGREDIENT_NAMES = [
+    'chicken breast', 'olive oil', 'garlic', 'onion', 'tomato', 'basil', 'rice', 'black beans',
+    'egg', 'milk', 'butter', 'flour', 'sugar', 'salt', 'pepper', 'spinach', 'broccoli', 'carrot',
+    'potato', 'salmon', 'lemon', 'parmesan', 'pasta', 'bell pepper', 'ginger', 'soy sauce',
+    'honey', 'yogurt', 'oats', 'banana', 'quinoa', 'chickpeas', 'tofu', 'mushrooms', 'zucchini',
+    'cumin', 'paprika', 'cilantro', 'lime', 'avocado', 'cheddar', 'ground beef', 'bacon', 'kale',
+]
+UNITS = ['g', 'kg', 'ml', 'cup', 'cups', 'tbsp', 'tsp', 'oz', 'servings', 'pieces', '']
+AISLES = ['Produce', 'Meat', 'Dairy', 'Baking', 'Spices and Seasonings', 'Pasta and Rice', 'Canned and Jarred']
+
+# Real responses list ~30 nutrients per recipe, in no fixed order
+NUTRIENT_NAMES = [
+    'Calories', 'Fat', 'Saturated Fat', 'Carbohydrates', 'Net Carbohydrates', 'Sugar', 'Cholesterol',
+    'Sodium', 'Protein', 'Vitamin C', 'Manganese', 'Fiber', 'Vitamin A', 'Vitamin B6', 'Folate',
+    'Potassium', 'Magnesium', 'Copper', 'Phosphorus', 'Iron', 'Vitamin K', 'Vitamin E', 'Calcium',
+    'Zinc', 'Selenium', 'Vitamin B1', 'Vitamin B2', 'Vitamin B3', 'Vitamin B5', 'Vitamin D',
+]
+
+
+def make_recipe(recipe_id: int, num_ingredients: int, rng: random.Random) -> Dict:
+    """Build one complexSearch result with addRecipeInformation and addRecipeNutrition fields."""
+    ingredients = []
+    for _ in range(num_ingredients):
+        name = rng.choice(INGREDIENT_NAMES)
+        amount = round(rng.uniform(0.25, 500), 2)
+        unit = rng.choice(UNITS)
+        ingredients.append({
+            'id': INGREDIENT_NAMES.index(name) + 1000,
+            'name': name,
+            'amount': amount,
+            'unit': unit,
+            'original': f"{amount} {unit} {name}".strip(),
+            'aisle': rng.choice(AISLES),
+        })
+
+    nutrients = [
+        {'name': name, 'amount': round(rng.uniform(0, 900), 2), 'unit': 'g', 'percentOfDailyNeeds': 0.0}
+        for name in rng.sample(NUTRIENT_NAMES, len(NUTRIENT_NAMES))
+    ]
+    return {
+        'id': recipe_id,
+        'title': f"Synthetic Recipe {recipe_id}",
+        'servings': rng.randint(1, 8),
+        'readyInMinutes': rng.randint(5, 120),
+        'pricePerServing': round(rng.uniform(20, 900), 2),
+        'sourceUrl': f"https://example.com/recipes/{recipe_id}",
+        'image': f"https://img.example.com/{recipe_id}-556x370.jpg",
+        'extendedIngredients': ingredients,
+        'nutrition': {'nutrients': nutrients},
+    }
+
+
+def make_complex_search_results(num_recipes: int, ingredients_per_recipe: int = 12, seed: int = 0) -> List[Dict]:
+    """Return the 'results' list of a synthetic complexSearch response."""
+    rng = random.Random(seed)
+    return [
+        make_recipe(recipe_id, rng.randint(max(1, ingredients_per_recipe // 2), ingredients_per_recipe * 3 // 2), rng)
+        for recipe_id in range(1, num_recipes + 1)
+    ]
+
+
+def make_sparse_search_results(num_recipes: int, ingredients_per_recipe: int = 12, seed: int = 0) -> List[Dict]:
+    """
+    Like make_complex_search_results, but with the nulls real responses contain: every
+    fifth ingredient has a null id and every tenth recipe has null servings.
+    """
+    results = make_complex_search_results(num_recipes, ingredients_per_recipe, seed)
+    for position, recipe in enumerate(results):
+        for ingredient in recipe['extendedIngredients'][::5]:
+            ingredient['id'] = None
+        if position % 10 == 9:
+            recipe['servings'] = None
+    return results
@@ -0,0 +1,245 @@
+"""
+Offline benchmark suite for the meal planner's hot paths.
+
+Times Spoonacular payload parsing, pantry matching, unit conversion, Database
+reads and writes, Ingredient inventory helpers, MealPlan conversions and the
+meal-plan optimizer against synthetic data, prints a summary, and optionally
+writes machine-readable JSON and compares it with a stored baseline.
+
+    python -m benchmarks                          # run and compare with benchmarks/baseline.json
+    python -m benchmarks --rows 1000,1000000      # larger inventory databases
+    python -m benchmarks --output results.json    # write results as JSON
+    python -m benchmarks --save-baseline          # store this run as the new baseline
+
+Page cold-start import times are checked separately by benchmarks/importtime.py.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from benchmarks.bench_parser import best_of, offline_api
+from benchmarks.databases import populate_database
+from benchmarks.payloads import INGREDIENT_NAMES, make_complex_search_results
+from models.ingredients import Ingredient
+from models.meal_plan import MealPlan
+from services.ingredient_matcher import IngredientMatcher
+from services.meal_optimizer import MealPlanOptimizer
+from services.plan_history import PlanHistory
+from services.units import canonicalize
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+MEAL_TYPES = ["breakfast", "lunch", "dinner"]
+
+# A case is (name, size, setup); setup returns the zero-argument callable to time.
+Case = Tuple[str, int, Callable[[], Callable[[], object]]]
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def make_meal_plan_frame(num_days: int, per_slot: int, recipe_ids: List[int]) -> pd.DataFrame:
+    """A Meal Planning page plan frame with `per_slot` recipes per day and meal type."""
+    start = datetime(2024, 1, 1)
+    rows = [
+        {
+            'date': (start + timedelta(days=day)).strftime("%Y-%m-%d"),
+            'num_days': num_days,
+            'meal_type': meal_type,
+            'recipe_id': recipe_ids[(day * 3 + meal * per_slot + slot) % len(recipe_ids)],
+            'recipe_name': f"Synthetic Recipe {recipe_ids[(day * 3 + meal * per_slot + slot) % len(recipe_ids)]}"
+        }
+        for slot in range(per_slot)
+        for day in range(num_days)
+        for meal, meal_type in enumerate(MEAL_TYPES)
+    ]
+    return pd.DataFrame(rows)
+
+
+def parser_cases(recipe_counts: List[int]) -> List[Case]:
+    api = offline_api()
+    cases = []
+    for count in recipe_counts:
+        def setup(count=count):
+            payload = make_complex_search_results(count)
+            return lambda: api.parse_recipe_data(payload)
+        cases.append(("SpoonacularAPI.parse_recipe_data", count, setup))
+
+        def match(count=count):
+            recipes_df, ingredients_df, _ = api.parse_recipe_data(make_complex_search_results(count))
+            matcher = IngredientMatcher(INGREDIENT_NAMES[::3])
+            return lambda: matcher.rank(recipes_df, ingredients_df, 'max-used-ingredients')
+        cases.append(("IngredientMatcher.rank", count, match))
+
+        def units(count=count):
+            _, ingredients_df, _ = api.parse_recipe_data(make_complex_search_results(count))
+            return lambda: canonicalize(ingredients_df)
+        cases.append(("units.canonicalize", count, units))
+    return cases
+
+
+def database_cases(row_counts: List[int], workdir: str) -> List[Case]:
+    cases = []
+    for rows in row_counts:
+        path = os.path.join(workdir, f"inventory_{rows}.db")
+        state = {}
+
+        def db(rows=rows, path=path, state=state):
+            if 'db' not in state:
+                state['db'] = populate_database(path, rows)
+            return state['db']
+
+        def single_inserts(db=db):
+            database = db()
+            rows_to_add = [Ingredient(name="benchmark item", amount=1.0, unit="g", expiry_date=datetime.now())] * 100
+            return lambda: [database.add_ingredient(row) for row in rows_to_add]
+
+        def batch_insert(db=db):
+            database = db()
+            rows_to_add = [Ingredient(name="benchmark item", amount=1.0, unit="g", expiry_date=datetime.now())] * 100
+            return lambda: database.add_ingredients(rows_to_add)
+
+        cases += [
+            ("Database.add_ingredient x100", rows, single_inserts),
+            ("Database.add_ingredients x100", rows, batch_insert),
+            ("Database.get_ingredients", rows, lambda db=db: db().get_ingredients),
+            ("Ingredient.load_inventory", rows, lambda db=db: (lambda database=db(): Ingredient.load_inventory(database))),
+            ("Ingredient.get_ingredient_names", rows, lambda db=db: (lambda database=db(): Ingredient.get_ingredient_names(database))),
+            ("Database.get_meal_plan_entries", rows, lambda db=db: (lambda database=db(): database.get_meal_plan_entries(recipe_id=1))),
+            ("PlanHistory.page", rows, lambda db=db: (lambda history=PlanHistory(db()): history.page())),
+        ]
+    return cases
+
+
+def meal_plan_cases(day_counts: List[int], per_slot: int, workdir: str) -> List[Case]:
+    cases = []
+    for num_days in day_counts:
+        def frame(num_days=num_days):
+            return make_meal_plan_frame(num_days, per_slot, list(range(1, num_days * 3 * per_slot + 1)))
+
+        def from_dataframe(frame=frame):
+            df = frame()
+            return lambda: MealPlan.from_dataframe(df)
+
+        def to_dataframe(frame=frame):
+            plan = MealPlan.from_dataframe(frame())
+            return plan.to_dataframe
+
+        def add_meal_plan(frame=frame, num_days=num_days):
+            df = frame()
+            plan = MealPlan.from_dataframe(df)
+            recipes_df, ingredients_df, nutrition_df = offline_api().parse_recipe_data(
+                make_complex_search_results(int(df['recipe_id'].max()))
+            )
+            database = populate_database(os.path.join(workdir, f"plans_{num_days}.db"), 1000)
+            return lambda: plan.add_meal_plan(database, recipes_df, nutrition_df, ingredients_df)
+
+        cases += [
+            ("MealPlan.from_dataframe", num_days, from_dataframe),
+            ("MealPlan.to_dataframe", num_days, to_dataframe),
+            ("MealPlan.add_meal_plan", num_days, add_meal_plan),
+        ]
+    return cases
+
+
+def optimizer_cases(pool_sizes: List[int]) -> List[Case]:
+    goals = {'calories': (1800, 2200), 'protein': (100, 200), 'carbs': (150, 300),
+             'fat': (40, 90), 'fiber': (20, 60), 'sugar': (0, 80)}
+    cases = []
+    for size in pool_sizes:
+        def setup(size=size):
+            recipes_df, ingredients_df, nutrition_df = offline_api().parse_recipe_data(make_complex_search_results(size))
+            optimizer = MealPlanOptimizer(recipes_df, nutrition_df, ingredients_df, ['garlic', 'onion', 'rice', 'egg'])
+            return lambda: optimizer.solve(goals, 7, '2024-01-01', max_repeats=2)
+        cases.append(("MealPlanOptimizer.solve 7 days", size, setup))
+    return cases
+
+
+def run_cases(cases: List[Case], repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for name, size, setup in cases:
+        key = f"{name}[{size}]"
+        try:
+            seconds = best_of(setup(), repeat)
+            results[key] = {'seconds': seconds, 'repeat': repeat}
+            print(f"{key:<50} {seconds * 1000:12.3f} ms", flush=True)
+        except Exception as e:
+            results[key] = {'error': f"{type(e).__name__}: {e}"}
+            print(f"{key:<50} {'ERROR':>12}    {type(e).__name__}: {e}", flush=True)
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Return a line per case slower than the baseline by more than `tolerance` (a fraction)."""
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key, {})
+        if 'seconds' not in result or 'seconds' not in previous:
+            continue
+        ratio = result['seconds'] / previous['seconds']
+        if ratio > 1 + tolerance:
+            regressions.append(f"{key}: {previous['seconds'] * 1000:.3f} ms -> {result['seconds'] * 1000:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=_int_list, default=[100, 1000], help="Payload sizes for parsing, comma-separated")
+    parser.add_argument("--rows", type=_int_list, default=[1000, 10000], help="Ingredient rows per database, comma-separated")
+    parser.add_argument("--plan-days", type=_int_list, default=[7, 28], help="Meal plan lengths in days, comma-separated")
+    parser.add_argument("--pool", type=_int_list, default=[1000, 5000], help="Recipe pool sizes for the optimizer, comma-separated")
+    parser.add_argument("--per-slot", type=int, default=2, help="Recipes per day and meal type in meal plans")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = (
+            parser_cases(args.recipes)
+            + database_cases(args.rows, workdir)
+            + meal_plan_cases(args.plan_days, args.per_slot, workdir)
+            + optimizer_cases(args.pool)
+        )
+        results = run_cases(cases, args.repeat)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
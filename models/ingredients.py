@@ -1,6 +1,6 @@
 from datetime import datetime
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List
 from services.database import Database
 
 @dataclass
@@ -49,7 +49,18 @@ class Ingredient:
         ) 
 
     @classmethod
-    def load_inventory(cls, db) -> list['Ingredient']:
+    def load_inventory(cls, db, **filters) -> list['Ingredient']:
+        """
+        Load ingredients from the database as Ingredient objects.
+
+        Args:
+            db: Database instance to fetch ingredients from
+            **filters: Optional SQL-side filters passed to Database.iter_ingredients
+                (pantry_only, name_prefix, expiring_before, recipe_ids)
+
+        Returns:
+            list[Ingredient]: The matching ingredients
+        """
         return [
             cls(
                 name=ing['name'],
@@ -59,19 +70,71 @@ class Ingredient:
                 original_string=ing.get('original_string'),
                 aisle=ing.get('aisle')
             )
-            for ing in db.get_ingredients()
+            for ing in db.iter_ingredients(**filters)
         ]
 
     @classmethod
-    def get_ingredient_names(cls, db) -> List[str]:
+    def get_ingredient_names(cls, db, pantry_only: bool | None = None) -> List[str]:
         """
         Returns a list of all unique ingredient names currently in the inventory.
         
         Args:
             db: Database instance to fetch ingredients from
+            pantry_only: Restrict to pantry items (True) or recipe ingredients (False)
             
         Returns:
-            List[str]: A sorted list of unique ingredient names
+            List[str]: A sorted list of unique lowercased ingredient names
+        """
+        return db.get_ingredient_names(pantry_only=pantry_only)
+
+    @classmethod
+    def get_expiring(cls, db, within_days: int) -> list['Ingredient']:
+        """
+        Returns pantry items expiring within the given number of days, soonest first.
+
+        Args:
+            db: Database instance to fetch ingredients from
+            within_days: Size of the expiry window in days
+
+        Returns:
+            list[Ingredient]: The expiring ingredients ordered by expiry date
+        """
+        return [
+            cls(
+                name=ing['name'],
+                amount=ing['amount'],
+                unit=ing['unit'],
+                expiry_date=ing['expiry_date'],
+                original_string=ing.get('original_string'),
+                aisle=ing.get('aisle')
+            )
+            for ing in db.get_expiring_ingredients(within_days)
+        ]
+
+    @classmethod
+    def get_totals(cls, db, canonical: bool = False) -> List[Dict]:
+        """
+        Returns summed pantry quantities per ingredient name and unit.
+
+        Args:
+            db: Database instance to fetch ingredients from
+            canonical: Convert to canonical units (g, ml, piece) first, so that
+                e.g. 500 g and 1 kg of the same ingredient sum to 1500 g
+
+        Returns:
+            List[Dict]: Rows with name, unit, amount, items and earliest_expiry
         """
-        ingredients = cls.load_inventory(db)
-        return sorted(list({ingredient.name.lower() for ingredient in ingredients}))
+        totals = db.get_ingredient_totals(pantry_only=True)
+        if not canonical or not totals:
+            return totals
+        import pandas as pd
+        from services.units import canonicalize
+
+        converted = canonicalize(pd.DataFrame(totals))
+        grouped = converted.groupby(['name', 'unit'], sort=True).agg(
+            amount=('amount', 'sum'), items=('items', 'sum'), earliest_expiry=('earliest_expiry', 'min')
+        ).reset_index()
+        records = grouped.to_dict('records')
+        for row in records:
+            row['earliest_expiry'] = row['earliest_expiry'].to_pydatetime() if pd.notna(row['earliest_expiry']) else None
+        return records
@@ -1,34 +1,71 @@
 from dataclasses import dataclass
-from typing import List, Dict
-from models.recipe import Recipe
-import pandas as pd
-from services.database import Database
-from models.ingredients import Ingredient
-from models.nutrition import Nutrition
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+
 
 @dataclass
 class MealPlan:
+    """
+    A saved meal plan.
+
+    breakfast, lunch and dinner hold one list of recipe ids per day of the plan,
+    so breakfast[d] is every recipe planned for breakfast on day d.
+    """
     start_date: str
     num_days: int
-    breakfast: List[int]
-    lunch: List[int]
-    dinner: List[int]
+    breakfast: List[List[int]]
+    lunch: List[List[int]]
+    dinner: List[List[int]]
 
     @classmethod
-    def from_dataframe(cls, df: pd.DataFrame) -> 'MealPlan':
-        """Create a MealPlan instance from a DataFrame"""
-        # Get unique dates to determine start_date and num_days
-        dates = pd.to_datetime(df['date'].unique())
-        
-        # Drop unwanted columns and filter by meal type
-        recipe_df = df.drop(columns=['date', 'num_days', 'meal_type'])
-        
+    def from_dataframe(cls, df: 'pd.DataFrame') -> 'MealPlan':
+        """
+        Create a MealPlan instance from a DataFrame with date, meal_type and recipe_id
+        columns (and optionally num_days), such as MealPlanBuffer.to_dataframe().
+
+        Entries are grouped by meal type and day in one stable sort, so recipes keep
+        the order they were added in within each slot. The input is not modified.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if df.empty:
+            raise ValueError("Cannot create a MealPlan from an empty DataFrame")
+
+        dates = pd.to_datetime(df['date'])
+        start = dates.min()
+        days = (dates - start).dt.days.to_numpy()
+        num_days = int(days.max()) + 1
+        if 'num_days' in df.columns:
+            num_days = max(num_days, int(df['num_days'].max()))
+
+        meal_codes = pd.Categorical(df['meal_type'], categories=MEAL_TYPES).codes
+        if (meal_codes < 0).any():
+            raise ValueError(f"Unknown meal types: {sorted(set(df['meal_type'][meal_codes < 0]))}")
+
+        # Stable sort by (meal type, day), then cut the recipe ids at each group boundary
+        order = np.lexsort((days, meal_codes))
+        group_keys = meal_codes[order].astype('int64') * num_days + days[order]
+        recipe_ids = df['recipe_id'].to_numpy()[order].astype('int64').tolist()
+        boundaries = np.flatnonzero(np.diff(group_keys)) + 1
+        starts = np.concatenate(([0], boundaries)).tolist()
+        ends = np.concatenate((boundaries, [len(order)])).tolist()
+
+        meals = {meal_type: [[] for _ in range(num_days)] for meal_type in MEAL_TYPES}
+        for key, group_start, group_end in zip(group_keys[starts].tolist(), starts, ends):
+            meal_code, day = divmod(key, num_days)
+            meals[MEAL_TYPES[meal_code]][day] = recipe_ids[group_start:group_end]
+
         return cls(
-            start_date=dates[0].strftime('%Y-%m-%d'),
-            num_days=len(dates),
-            breakfast=[row['recipe_id'] for _, row in recipe_df[df['meal_type'] == 'breakfast'].iterrows()],
-            lunch=[row['recipe_id'] for _, row in recipe_df[df['meal_type'] == 'lunch'].iterrows()],
-            dinner=[row['recipe_id'] for _, row in recipe_df[df['meal_type'] == 'dinner'].iterrows()]
+            start_date=start.strftime('%Y-%m-%d'),
+            num_days=num_days,
+            breakfast=meals['breakfast'],
+            lunch=meals['lunch'],
+            dinner=meals['dinner']
         )
 
     def to_dict(self):
@@ -40,76 +77,69 @@ class MealPlan:
             'lunch': self.lunch,
             'dinner': self.dinner
         }
+
+    def recipe_ids(self) -> List[int]:
+        """Return the distinct recipe ids in the plan, in first-planned order."""
+        return list(dict.fromkeys(
+            recipe_id
+            for meals in (self.breakfast, self.lunch, self.dinner)
+            for day in meals
+            for recipe_id in day
+        ))
     
-    def to_dataframe(self) -> pd.DataFrame:
-        """Convert meal plan to a pandas DataFrame with recipe attributes as columns and meals as rows."""
-        rows = []
-        dates = pd.date_range(self.start_date, periods=self.num_days)
-        
-        for date in dates:
-            for meal_type, recipes in [('breakfast', self.breakfast), 
-                                     ('lunch', self.lunch), 
-                                     ('dinner', self.dinner)]:
-                recipe_idx = (date - pd.Timestamp(self.start_date)).days
-                recipe = recipes[recipe_idx]
-                
-                # Get all attributes from the recipe object
-                row = vars(recipe)
-                # Add date and meal_type
-                row.update({
-                    'date': date,
-                    'meal_type': meal_type
-                })
-                rows.append(row)
-        
-        return pd.DataFrame(rows)
-
-    def add_meal_plan(self, db, recipes_df: pd.DataFrame, nutrition_df: pd.DataFrame, ingredients_df: pd.DataFrame) -> None:
-        """Save meal plan and its recipes to SQLite database"""
-        # First add all recipes to the database
-        for recipe_id in self.breakfast + self.lunch + self.dinner:
-            if recipe_id in recipes_df.index:
-                # Add recipe
-                recipe_data = recipes_df.loc[recipe_id]
-                recipe = Recipe(
-                    recipe_id=recipe_id,
-                    recipe_name=recipe_data['name'],
-                    source_url=recipe_data['source_url'],
-                    total_cost=recipe_data['total_cost'],
-                    prep_time=recipe_data['prep_time'],
-                    image_url=recipe_data['image_url'],
-                    servings=recipe_data['servings']
-                )
-                db.add_recipe(recipe)
-                
-                # Add ingredients for this recipe
-                recipe_ingredients = ingredients_df[ingredients_df['recipe_id'] == recipe_id]
-                for _, ing_data in recipe_ingredients.iterrows():
-                    ingredient = Ingredient(
-                        ingredient_id=ing_data['ingredient_id'],
-                        name=ing_data['name'],
-                        amount=ing_data['amount'],
-                        unit=ing_data['unit'],
-                        original_string=ing_data['original_string'],
-                        aisle=ing_data['aisle'],
-                        recipe_id=recipe_id,
-                        expiry_date=None
-                    )
-                    db.add_ingredient(ingredient)
-                
-                # Add nutrition data
-                nutrition_data = nutrition_df.loc[recipe_id]
-                nutrition = Nutrition(
-                    recipe_id=recipe_id,
-                    calories=nutrition_data['calories'],
-                    protein=nutrition_data['protein'],
-                    carbs=nutrition_data['carbs'],
-                    fat=nutrition_data['fat'],
-                    fiber=nutrition_data['fiber'],
-                    sodium=nutrition_data['sodium'],
-                    cholesterol=nutrition_data['cholesterol'],
-                )
-                db.add_nutrition(nutrition)
-        
-        # Then add the meal plan
-        db.add_meal_plan(self)
+    def to_dataframe(self, recipes_df: Optional['pd.DataFrame'] = None) -> 'pd.DataFrame':
+        """
+        Convert meal plan to a pandas DataFrame with one row per planned meal.
+
+        Rows are ordered by date, then meal type, with date, num_days, meal_type and
+        recipe_id columns, the inverse of from_dataframe. If recipes_df (indexed by
+        recipe_id) is given, its columns are joined on as recipe attributes.
+        """
+        import numpy as np
+        import pandas as pd
+
+        counts, meal_types, recipe_ids = [], [], []
+        for day in range(self.num_days):
+            for meal_type, meals in (('breakfast', self.breakfast), ('lunch', self.lunch), ('dinner', self.dinner)):
+                day_meals = meals[day] if day < len(meals) else []
+                counts.append(len(day_meals))
+                meal_types.append(meal_type)
+                recipe_ids.extend(day_meals)
+
+        dates = pd.date_range(self.start_date, periods=self.num_days).strftime('%Y-%m-%d').to_numpy()
+        df = pd.DataFrame({
+            'date': np.repeat(np.repeat(dates, len(MEAL_TYPES)), counts),
+            'num_days': self.num_days,
+            'meal_type': np.repeat(meal_types, counts),
+            'recipe_id': np.array(recipe_ids, dtype='int64')
+        })
+
+        if recipes_df is not None:
+            df = df.join(recipes_df, on='recipe_id')
+        return df
+
+    def add_meal_plan(self, db, recipes_df: 'pd.DataFrame', nutrition_df: 'pd.DataFrame', ingredients_df: 'pd.DataFrame') -> int:
+        """
+        Save meal plan and its recipes to SQLite database in a single transaction.
+
+        Recipes and nutrition rows are upserted, and each recipe's stored ingredients are
+        replaced, so saving a plan that reuses previously saved recipes does not duplicate them.
+        An empty ingredients_df leaves stored ingredients as they are.
+        The plan's per-day and total nutrition and cost summaries are computed from the
+        rows just written, in the same transaction.
+
+        Returns:
+            int: The id of the new meal plan row
+        """
+        recipe_ids = self.recipe_ids()
+        recipes = recipes_df[recipes_df.index.isin(recipe_ids)]
+        saved_ids = recipes.index
+
+        with db.transaction():
+            db.add_recipes(recipes)
+            # Offline search results can have no ingredient rows, or no columns at all
+            if not ingredients_df.empty:
+                db.delete_recipe_ingredients(saved_ids)
+                db.add_ingredients(ingredients_df[ingredients_df['recipe_id'].isin(saved_ids)])
+            db.add_nutrition_rows(nutrition_df[nutrition_df.index.isin(saved_ids)])
+            return db.add_meal_plan(self)
@@ -0,0 +1,103 @@
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# (date, meal_type, recipe_id)
+EntryKey = Tuple[str, str, int]
+
+MEAL_PLAN_COLUMNS = ['date', 'num_days', 'meal_type', 'recipe_id', 'recipe_name']
+
+
+class MealPlanBuffer:
+    """
+    In-progress meal plan kept in Streamlit session state.
+
+    Entries are stored in insertion order keyed by (date, meal_type, recipe_id), with a
+    secondary index per (date, meal_type) slot, so adding, removing and looking up a
+    slot's meals are constant-time. The DataFrame view used by MealPlan.from_dataframe
+    is only built when asked for, and reused until the next change.
+
+    Listeners registered with add_listener are told about every change through their
+    entry_added(entry), entry_removed(entry) and cleared() methods, so derived views
+    can update incrementally.
+    """
+
+    def __init__(self):
+        self._entries: Dict[EntryKey, Dict] = {}
+        self._slots: Dict[Tuple[str, str], Dict[EntryKey, None]] = {}
+        self._frame: Optional['pd.DataFrame'] = None
+        self._listeners: List = []
+
+    def add_listener(self, listener) -> None:
+        """Register a listener and replay the current entries to it."""
+        self._listeners.append(listener)
+        for entry in self._entries.values():
+            listener.entry_added(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._entries.values())
+
+    def __contains__(self, key: EntryKey) -> bool:
+        return key in self._entries
+
+    @property
+    def empty(self) -> bool:
+        return not self._entries
+
+    def add(self, date: str, meal_type: str, recipe_id: int, recipe_name: str, num_days: int) -> bool:
+        """Add a meal to a slot. Returns False if that recipe is already in the slot."""
+        key = (date, meal_type, int(recipe_id))
+        if key in self._entries:
+            return False
+        self._entries[key] = {
+            'date': date,
+            'num_days': num_days,
+            'meal_type': meal_type,
+            'recipe_id': int(recipe_id),
+            'recipe_name': recipe_name
+        }
+        self._slots.setdefault((date, meal_type), {})[key] = None
+        self._frame = None
+        for listener in self._listeners:
+            listener.entry_added(self._entries[key])
+        return True
+
+    def remove(self, date: str, meal_type: str, recipe_id: int) -> bool:
+        """Remove a meal from a slot. Returns False if it was not planned."""
+        key = (date, meal_type, int(recipe_id))
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        slot = self._slots[(date, meal_type)]
+        del slot[key]
+        if not slot:
+            del self._slots[(date, meal_type)]
+        self._frame = None
+        for listener in self._listeners:
+            listener.entry_removed(entry)
+        return True
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._slots.clear()
+        self._frame = None
+        for listener in self._listeners:
+            listener.cleared()
+
+    def slot(self, date: str, meal_type: str) -> List[Dict]:
+        """Return the entries planned for one date and meal type, in the order they were added."""
+        return [self._entries[key] for key in self._slots.get((date, meal_type), ())]
+
+    def recipe_ids(self) -> Set[int]:
+        return {key[2] for key in self._entries}
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+        """Return the plan as a DataFrame with MEAL_PLAN_COLUMNS, rebuilt only after changes."""
+        if self._frame is None:
+            import pandas as pd
+            self._frame = pd.DataFrame(list(self._entries.values()), columns=MEAL_PLAN_COLUMNS)
+        return self._frame
@@ -10,4 +10,5 @@ class Nutrition:
     sodium: int
     fat: int
     cholesterol: int
+    sugar: int | None = None
     
@@ -1,16 +1,9 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
-import json
-from typing import List, Dict
-import requests
-from services.database import Database
-import plotly.express as px
-from PIL import Image
-import io
-import os
-from services.spoonacular import SpoonacularAPI
+from datetime import datetime
 from models.ingredients import Ingredient
+from utils.defaults import EXPIRY_WARNING_DAYS
+from utils.config import initialize_session_state, get_reads, get_expiry_index
 
 
 def show_inventory_management():
@@ -34,23 +27,57 @@ def show_inventory_management():
             st.success(f"Added {name} to inventory!")
     
 
-    # Load inventory once and reuse it
-    inventory = Ingredient.load_inventory(st.session_state.db)
+    name_filter = st.text_input("Filter by name", placeholder="Start typing an ingredient name")
+
+    # Load only the pantry items shown below
+    inventory = Ingredient.load_inventory(get_reads(), pantry_only=True, name_prefix=name_filter.strip() or None)
     if inventory:
-        # Create single data structure for both displays
-        data = [
+        # Days until expiry for the whole listing in one vectorized subtraction
+        expiry = pd.to_datetime(pd.Series([ing.expiry_date for ing in inventory], dtype=object))
+        st.table(pd.DataFrame({
+            "Name": [ing.name for ing in inventory],
+            "Quantity": [f"{ing.amount} {ing.unit}" for ing in inventory],
+            "Days until expiry": (expiry - pd.Timestamp.now()).dt.days.astype('Int64')
+        }))
+
+    expiring = get_expiry_index().expiring(EXPIRY_WARNING_DAYS)
+    if expiring:
+        st.subheader(f"Expiring within {EXPIRY_WARNING_DAYS} days")
+        st.table(pd.DataFrame([
             {
-                "Name": ing.name,
-                "Quantity": f"{ing.amount} {ing.unit}",
-                "Days until expiry": ing.days_until_expiry()
+                "Name": item['name'],
+                "Quantity": f"{item['amount']} {item['unit']}",
+                "Expires": item['expiry_date'].strftime("%Y-%m-%d")
             }
-            for ing in inventory
-        ]
+            for item in expiring
+        ]))
+
+        with st.form("consume_ingredient"):
+            st.write("Use up an expiring item")
+            item = st.selectbox(
+                "Item",
+                expiring,
+                format_func=lambda item: f"{item['name']} ({item['amount']} {item['unit']}, expires {item['expiry_date']:%Y-%m-%d})"
+            )
+            amount = st.number_input("Amount used (0 uses all of it)", min_value=0.0)
+            if st.form_submit_button("Use"):
+                st.session_state.db.consume_ingredient(item['id'], amount or None)
+                st.rerun()
 
-        # Display current inventory using the same data
-        st.table(pd.DataFrame(data))
+    totals = Ingredient.get_totals(get_reads(), canonical=True)
+    if totals:
+        st.subheader("Totals by ingredient")
+        st.table(pd.DataFrame([
+            {
+                "Name": row['name'],
+                "Quantity": f"{row['amount']:g} {row['unit']}",
+                "Items": row['items']
+            }
+            for row in totals
+        ]))
 
 def main():
+    initialize_session_state()
     show_inventory_management()
 
 if __name__ == "__main__":
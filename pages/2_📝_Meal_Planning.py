@@ -1,29 +1,49 @@
 import streamlit as st
-from services.spoonacular import SpoonacularAPI
+from services.spoonacular import SpoonacularAPI, SpoonacularAPIError
 from datetime import datetime, timedelta
 import pandas as pd
-from utils.styles import RECIPE_TILE_STYLE
-from utils.defaults import MIN_CALORIES, MAX_CALORIES, MAX_TIME, MIN_CARBS, MAX_CARBS, MIN_PROTEIN, MAX_PROTEIN, MIN_FAT, MAX_FAT, MIN_FIBER, MAX_FIBER, MIN_SUGAR, MAX_SUGAR
-from utils.config import initialize_session_state
+from utils.styles import RECIPE_TILE_STYLE, PLACEHOLDER_IMAGE
+from utils.defaults import MIN_CALORIES, MAX_CALORIES, MAX_TIME, MIN_CARBS, MAX_CARBS, MIN_PROTEIN, MAX_PROTEIN, MIN_FAT, MAX_FAT, MIN_FIBER, MAX_FIBER, MIN_SUGAR, MAX_SUGAR, SEARCH_RESULT_COUNTS, RESULTS_PAGE_SIZE, IMAGE_DETAIL_SIZE
+from utils.config import initialize_session_state, initialize_planning_state, get_api, get_reads, get_image_cache, get_expiry_index
 from models.ingredients import Ingredient
 from models.meal_plan import MealPlan
+from services.meal_optimizer import MealPlanOptimizer
+from services.local_search import LocalRecipeSearch, load_recipe_frames
+from services.ingredient_matcher import IngredientMatcher
 
 
-def api_call(search_query, nutrition_goals, max_ready_time, sort):
+def api_call(search_query, nutrition_goals, max_ready_time, sort, use_cache=True, number=5, offline=False):
+    preview = st.empty()
+
+    def show_partial_results(partial_results):
+        partial_recipes = partial_results[0]
+        if not partial_recipes.empty:
+            with preview.container():
+                st.caption(f"Fetched {len(partial_recipes)} of up to {number} recipes...")
+                st.dataframe(partial_recipes[['name', 'prep_time', 'total_cost']], use_container_width=True)
+
     try:
-        api = SpoonacularAPI()
-        available_ingredients = Ingredient.get_ingredient_names(st.session_state.db)
-        available_ingredients = ",".join(available_ingredients) if available_ingredients else ""
+        api = LocalRecipeSearch(st.session_state.db) if offline else get_api()
+        matcher = IngredientMatcher.from_database(get_reads())
+        # Matching keys are singularized for local comparison; the search gets the names as stored
+        available_ingredients = ",".join(Ingredient.get_ingredient_names(get_reads(), pantry_only=True))
         
         recipes_df, ingredients_df, nutrition_df = api.search_recipes(
             search_query, 
             available_ingredients, 
             nutrition_goals, 
             max_ready_time, 
-            sort
+            sort,
+            use_cache=use_cache,
+            number=number,
+            on_page=show_partial_results
         )
-        return recipes_df, ingredients_df, nutrition_df
+        preview.empty()
+        return matcher.rank(recipes_df, ingredients_df, sort), ingredients_df, nutrition_df
 
+    except SpoonacularAPIError as e:
+        st.error(f"Recipe search is unavailable right now: {str(e)}. Please try again shortly.")
+        return None, None, None
     except Exception as e:
         st.error(f"Error fetching recipes: {str(e)}")
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
@@ -128,7 +148,9 @@ def recipe_deep_dive():
         recipe_ingredients = st.session_state.current_recipe['ingredients']
         nutrition = st.session_state.current_recipe['nutrition']
         
-        st.image(recipe['image_url'])
+        image = get_image_cache().get(recipe['image_url'], IMAGE_DETAIL_SIZE)
+        if image is not None:
+            st.image(image)
         st.title(recipe['name'])
         
         col1, col2 = st.columns([2, 1])
@@ -145,7 +167,8 @@ def recipe_deep_dive():
                 st.write(f"🍚 Carbs: {nutrition['carbs']:.1f}g")
                 st.write(f"🥑 Fat: {nutrition['fat']:.1f}g")
                 st.write(f"📊 Fiber: {nutrition['fiber']:.1f}g")
-                st.write(f"🍯 Sugar: {nutrition['sugar']:.1f}g")
+                sugar = nutrition.get('sugar')
+                st.write(f"🍯 Sugar: {sugar:.1f}g" if pd.notna(sugar) else "🍯 Sugar: n/a")
                     
         if st.button("Close Details"):
             st.session_state.selected_recipe = None
@@ -155,12 +178,11 @@ def recipe_deep_dive():
 
 def recipe_tile(recipe, nutrition_data):
     return f"""
-    <img src="{recipe['image_url']}" class="recipe-image" onerror="this.src='https://via.placeholder.com/300x200?text=No+Image'">
     <div class="recipe-title">{recipe['name']}</div>
     <div class="recipe-info">
         ⏱️ {recipe['prep_time']} minutes<br>
         👥 {recipe['servings']} servings<br>
-        💰 ${recipe['total_cost']:.2f}
+        💰 ${recipe['total_cost']:.2f}{'<br>⏳ Uses stock about to expire' if recipe.get('expiry_score', 0) > 0 else ''}
     </div>
     <div class="recipe-nutrition">
         Nutrition per serving:<br>
@@ -195,24 +217,119 @@ def display_meal_schedule():
                 st.subheader(meal_type.capitalize())
                 
                 # Display current meals for this slot
-                daily_meals = st.session_state.meal_plan[
-                    (st.session_state.meal_plan['date'] == date_str) & 
-                    (st.session_state.meal_plan['meal_type'] == meal_type)
-                ]
-                if not daily_meals.empty:
-                    for i, meal in daily_meals.iterrows():
+                daily_meals = st.session_state.meal_plan.slot(date_str, meal_type)
+                if daily_meals:
+                    for meal in daily_meals:
                         col1, col2 = st.columns([4, 1])
                         with col1:
                             st.write(f"• {meal['recipe_name']}")
                         with col2:
-                            if st.button("🗑️", key=f"remove_{date_str}_{meal_type}_{i}"):
-                                # Remove the meal from the DataFrame
-                                st.session_state.meal_plan = st.session_state.meal_plan.drop(index=i)
+                            if st.button("🗑️", key=f"remove_{date_str}_{meal_type}_{meal['recipe_id']}"):
+                                # Remove the meal from the plan
+                                st.session_state.meal_plan.remove(date_str, meal_type, meal['recipe_id'])
                                 st.rerun()
                 else:
                     st.write("No meals planned")
 
 
+def display_nutrition_totals(nutrition_goals):
+    """Show live per-day nutrition totals for the plan and flag days outside the daily goals."""
+    per_day = st.session_state.nutrition_totals.per_day()
+    if per_day.empty or st.session_state.meal_plan.empty:
+        return
+
+    st.subheader("Daily Nutrition")
+    below, above = st.session_state.nutrition_totals.goal_violations(nutrition_goals, per_day)
+
+    def highlight(column):
+        if column.name not in below.columns:
+            return [""] * len(column)
+        return [
+            "background-color: #FFD2D2" if is_below or is_above else ""
+            for is_below, is_above in zip(below[column.name], above[column.name])
+        ]
+
+    st.dataframe(per_day.style.apply(highlight).format("{:.0f}"), use_container_width=True)
+
+    off_target = below.any(axis=1) | above.any(axis=1)
+    if off_target.any():
+        st.warning(f"{int(off_target.sum())} day(s) fall outside your daily nutrition goals.")
+
+
+def display_shopping_list():
+    """Show what to buy for the current plan after subtracting pantry stock, by aisle."""
+    if st.session_state.meal_plan.empty:
+        return
+
+    shopping_list = st.session_state.shopping_list
+    shopping_list.refresh_pantry(get_reads())
+    st.subheader("Shopping List")
+    items = shopping_list.to_dataframe()
+    if items.empty:
+        st.info("Your pantry covers everything in this plan.")
+        return
+
+    for aisle, aisle_items in items.groupby('aisle', sort=False):
+        st.markdown(f"**{aisle}**")
+        st.dataframe(
+            aisle_items[['name', 'to_buy', 'unit', 'in_stock']].rename(columns={'to_buy': 'to buy', 'in_stock': 'in stock'}),
+            hide_index=True,
+            use_container_width=True
+        )
+
+    csv_col, markdown_col = st.columns(2)
+    with csv_col:
+        st.download_button("Download CSV", lambda: shopping_list.export('csv'), file_name="shopping_list.csv", mime="text/csv")
+    with markdown_col:
+        st.download_button("Download Markdown", lambda: shopping_list.export('markdown'), file_name="shopping_list.md", mime="text/markdown")
+
+
+def auto_plan_widget(nutrition_goals, start_date, num_days):
+    """Fill the meal plan automatically from search results or saved recipes."""
+    with st.expander("🪄 Auto-fill Meal Plan"):
+        pool_source = st.radio("Recipe pool", ["Search results", "Saved recipes"], horizontal=True, key="auto_plan_pool")
+        max_repeats = st.number_input(
+            "Max times a recipe may appear",
+            min_value=1,
+            value=num_days,
+            key="auto_plan_max_repeats",
+            help="Lower this for more variety across days."
+        )
+
+        if st.button("Generate Plan", key="auto_plan", use_container_width=True):
+            if pool_source == "Search results":
+                pool = st.session_state.search_results
+            else:
+                pool = load_recipe_frames(get_reads())
+            if pool is None or pool[0].empty:
+                st.warning("No recipes to plan with. Search for recipes or save a meal plan first.")
+                return
+
+            try:
+                optimizer = MealPlanOptimizer(
+                    pool[0], pool[2], pool[1],
+                    pantry_names=Ingredient.get_ingredient_names(get_reads(), pantry_only=True),
+                    expiry_scores=get_expiry_index().score(pool[1], pool[0].index)
+                )
+                result = optimizer.solve(nutrition_goals, num_days, start_date.strftime("%Y-%m-%d"), max_repeats=max_repeats)
+            except ValueError as e:
+                st.error(f"Could not build a plan: {str(e)}")
+                return
+
+            st.session_state.plan_pool = pool
+            st.session_state.nutrition_totals.register_nutrition(pool[2])
+            st.session_state.shopping_list.register_ingredients(pool[1])
+            st.session_state.meal_plan.clear()
+            for entry in result.meal_plan.to_dataframe(pool[0][['name']]).itertuples(index=False):
+                st.session_state.meal_plan.add(entry.date, entry.meal_type, entry.recipe_id, entry.name, num_days)
+
+            st.success(
+                f"Planned {len(st.session_state.meal_plan)} meals from {result.pool_size} recipes in "
+                f"{result.solve_time * 1000:.0f} ms: ${result.total_cost:.2f} total, "
+                f"{result.missing_ingredients} missing ingredients, {result.days_off_target} day(s) off target."
+            )
+
+
 def show_meal_planning():
     st.header("Meal Planning")
 
@@ -270,28 +387,66 @@ def show_meal_planning():
 
         sort = st.selectbox("Sort recipes by", ["max-used-ingredients", "min-missing-ingredients", "time"])
 
+        number = st.selectbox("Number of recipes to fetch", SEARCH_RESULT_COUNTS)
+
+        refresh_results = st.checkbox("Refresh results", help="Skip cached results and query Spoonacular again.")
+
+        offline = st.checkbox("Search saved recipes only", help="Search recipes from saved meal plans without calling Spoonacular.")
+
+        prioritize_expiring = st.checkbox("Prioritize ingredients about to expire", help="Show recipes that use up soon-to-expire pantry items first.")
+
         search_submitted = st.form_submit_button("Search Recipes")
         if search_submitted:
-            results = api_call(search_query, nutrition_goals, max_ready_time, sort)
+            results = api_call(search_query, nutrition_goals, max_ready_time, sort, use_cache=not refresh_results, number=number, offline=offline)
             if results[0] is not None:  # Check if recipes_df exists
+                if not results[0].empty:
+                    recipes_df = results[0].assign(expiry_score=get_expiry_index().score(results[1], results[0].index))
+                    if prioritize_expiring:
+                        recipes_df = recipes_df.sort_values('expiry_score', ascending=False, kind='stable')
+                    results = (recipes_df, results[1], results[2])
                 st.session_state.search_results = results
+                st.session_state.results_page = 1
+                st.session_state.nutrition_totals.register_nutrition(results[2])
+                st.session_state.shopping_list.register_ingredients(results[1])
     
     # Display results outside the form
     if st.session_state.search_results:
         recipes_df, ingredients_df, nutrition_df = st.session_state.search_results
         
         if not recipes_df.empty:
+            # Render one page of tiles at a time
+            num_pages = -(-len(recipes_df) // RESULTS_PAGE_SIZE)
+            page = 1
+            if num_pages > 1:
+                if st.session_state.get('results_page', 1) > num_pages:
+                    st.session_state.results_page = 1
+                page = st.selectbox(
+                    "Page",
+                    range(1, num_pages + 1),
+                    key="results_page",
+                    format_func=lambda page: f"{page} of {num_pages}"
+                )
+            page_df = recipes_df.iloc[(page - 1) * RESULTS_PAGE_SIZE:page * RESULTS_PAGE_SIZE]
+
+            # Row positions of each recipe's ingredients, found in one pass rather than one scan per tile
+            ingredient_rows = ingredients_df.groupby('recipe_id', sort=False).indices if not ingredients_df.empty else {}
+
+            # Download any uncached thumbnails together rather than one per tile
+            get_image_cache().prefetch(page_df['image_url'])
+
             # Display recipes in a grid
             cols = st.columns(3)
             
             # Iterate through DataFrame
-            for idx, row in enumerate(recipes_df.itertuples()):
+            for idx, row in enumerate(page_df.itertuples()):
                 with cols[idx % 3]:
                     with st.container():
                         # Get nutrition data using loc once
                         nutrition_data = nutrition_df.loc[row.Index]
-                        recipe_ingredients = ingredients_df[ingredients_df['recipe_id'] == row.Index]
-                        
+                        recipe_ingredients = ingredients_df.iloc[ingredient_rows.get(row.Index, [])]
+
+                        # Bytes are served from a content-hashed /media/ URL the browser can cache
+                        st.image(get_image_cache().get(row.image_url) or PLACEHOLDER_IMAGE, width='stretch')
                         st.markdown(f"""
                             <div class="recipe-tile">
                                 {recipe_tile(row._asdict(), nutrition_data)}                            
@@ -315,23 +470,15 @@ def show_meal_planning():
                         if st.button("➕ Add", key=f"add_{row.Index}", use_container_width=True):
                             meal_type = st.session_state[f"meal_type_{row.Index}"].lower()
                             
-                            # Create dates DataFrame for more efficient operations
                             dates = pd.date_range(start=start_date, periods=num_days)
                             for date in dates:
-                                date_str = date.strftime("%Y-%m-%d")
-                                # Create a new row for the DataFrame
-                                new_row = {
-                                    'date': date_str,
-                                    'num_days': num_days,
-                                    'meal_type': meal_type,
-                                    'recipe_id': row.Index,
-                                    'recipe_name': row.name
-                                }
-                                # Append the new row to the DataFrame
-                                st.session_state.meal_plan = pd.concat([
-                                    st.session_state.meal_plan,
-                                    pd.DataFrame([new_row])
-                                ], ignore_index=True)
+                                st.session_state.meal_plan.add(
+                                    date=date.strftime("%Y-%m-%d"),
+                                    meal_type=meal_type,
+                                    recipe_id=row.Index,
+                                    recipe_name=row.name,
+                                    num_days=num_days
+                                )
                             
                             st.success(f"Added {row.name} to {meal_type} for {num_days} days starting {start_date}!")
 
@@ -346,21 +493,24 @@ def show_meal_planning():
     today = datetime.now().date()
     week_dates = [today + timedelta(days=i) for i in range(7)]
     
+    auto_plan_widget(nutrition_goals, start_date, num_days)
     display_meal_schedule()
-
+    display_nutrition_totals(nutrition_goals)
+    display_shopping_list()
 
     if st.button("💾 Save Meal Plan", type="primary", use_container_width=True):
         try:
             # Filter DataFrames based on recipe_ids in meal_plan
-            recipe_ids = st.session_state.meal_plan['recipe_id'].unique()
-            recipes_df, ingredients_df, nutrition_df = st.session_state.search_results
+            recipe_ids = list(st.session_state.meal_plan.recipe_ids())
+            sources = [st.session_state.search_results, st.session_state.get('plan_pool')]
+            recipes_df, ingredients_df, nutrition_df = SpoonacularAPI.merge_pages([source for source in sources if source is not None])
             
             st.session_state.recipes = recipes_df[recipes_df.index.isin(recipe_ids)]
             st.session_state.ingredients = ingredients_df[ingredients_df['recipe_id'].isin(recipe_ids)]
             st.session_state.nutrition = nutrition_df[nutrition_df.index.isin(recipe_ids)]
             
             # Create and save meal plan
-            meal_plan = MealPlan.from_dataframe(st.session_state.meal_plan)
+            meal_plan = MealPlan.from_dataframe(st.session_state.meal_plan.to_dataframe())
             meal_plan.add_meal_plan(st.session_state.db, st.session_state.recipes, st.session_state.nutrition, st.session_state.ingredients)
             st.success("Meal plan saved successfully!")
         except Exception as e:
@@ -369,6 +519,7 @@ def show_meal_planning():
 
 def main():
     initialize_session_state()
+    initialize_planning_state()
     show_meal_planning()
 
 
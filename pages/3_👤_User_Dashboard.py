@@ -1,7 +1,12 @@
+import calendar
+from datetime import date, timedelta
 import streamlit as st
 import plotly.graph_objects as go
+from services.plan_history import PlanHistory
+from utils.config import initialize_session_state, get_reads
 
 st.title("User Dashboard")
+initialize_session_state()
 
 col1, col2 = st.columns(2)
 
@@ -78,37 +83,72 @@ st.subheader("📋 Previous Meal Plans")
 # Create tabs for different views
 list_tab, calendar_tab = st.tabs(["List View", "Calendar View"])
 
+
+
+def plan_days_table(days):
+    """Markdown table of a plan's per-day totals."""
+    lines = [
+        "| Date | Meals | Calories | Protein | Carbs | Fat | Cost |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for day in days:
+        lines.append(
+            f"| {day['date']} | {day['meals']} | {day['calories']:.0f} kcal | {day['protein']:.1f} g | "
+            f"{day['carbs']:.1f} g | {day['fat']:.1f} g | ${day['cost']:.2f} |"
+        )
+    return "\n".join(lines)
+
+
+def month_calendar_html(year, month, days):
+    """HTML month grid showing each day's planned meals and calories."""
+    header = "".join(f"<th>{name}</th>" for name in calendar.day_abbr)
+    weeks = []
+    for week in calendar.Calendar().monthdatescalendar(year, month):
+        cells = []
+        for day in week:
+            totals = days.get(day)
+            style = "color: #bbb;" if day.month != month else ""
+            details = f"<br>🍽️ {totals['meals']}<br>🔥 {totals['calories']:.0f}" if totals else ""
+            cells.append(f'<td style="vertical-align: top; height: 70px; {style}">{day.day}{details}</td>')
+        weeks.append(f"<tr>{''.join(cells)}</tr>")
+    return f'<table style="width: 100%; text-align: center;"><tr>{header}</tr>{"".join(weeks)}</table>'
+
+
+history = PlanHistory(get_reads())
+
 with list_tab:
-    # You'll need to implement a function to fetch meal plans from your database
-    # This is a placeholder structure
-    if 'meal_plans' not in st.session_state:
-        st.session_state.meal_plans = []  # Replace with actual database fetch
-        
-    if not st.session_state.meal_plans:
+    if 'plan_history_pages' not in st.session_state:
+        st.session_state.plan_history_pages = 1
+
+    # Pages already shown are re-read through the read cache, so they stay current after a new save
+    plans, has_more = history.pages(st.session_state.plan_history_pages)
+
+    if not plans:
         st.info("No meal plans found. Create your first meal plan!")
     else:
-        for plan in st.session_state.meal_plans:
-            with st.expander(f"Meal Plan - {plan.get('date', 'Unknown Date')}"):
-                # Display meal plan details
-                st.write(f"**Calories:** {plan.get('calories', 'N/A')} kcal")
-                st.write(f"**Protein:** {plan.get('protein', 'N/A')} g")
-                # Add more nutritional information as needed
-                
-                # Add buttons for actions
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    if st.button("View Details", key=f"view_{plan.get('id')}"):
-                        # Implement view functionality
-                        pass
-                with col2:
-                    if st.button("Edit", key=f"edit_{plan.get('id')}"):
-                        # Implement edit functionality
-                        pass
-                with col3:
-                    if st.button("Delete", key=f"delete_{plan.get('id')}"):
-                        # Implement delete functionality
-                        pass
+        for plan in plans:
+            num_days = max(plan['num_days'], 1)
+            end_date = date.fromisoformat(plan['start_date'][:10]) + timedelta(days=num_days - 1)
+            with st.expander(f"Meal Plan - {plan['start_date']} to {end_date:%Y-%m-%d} ({plan['meals']} meals)"):
+                st.write(f"**Calories:** {plan['calories']:.0f} kcal ({plan['calories'] / num_days:.0f} per day)")
+                st.write(f"**Protein:** {plan['protein']:.1f} g ({plan['protein'] / num_days:.1f} per day)")
+                st.write(f"**Carbs:** {plan['carbs']:.1f} g ({plan['carbs'] / num_days:.1f} per day)")
+                st.write(f"**Fat:** {plan['fat']:.1f} g ({plan['fat'] / num_days:.1f} per day)")
+                st.write(f"**Cost:** ${plan['cost']:.2f}")
 
-with calendar_tab:
-    st.info("Calendar view coming soon!")
+                if st.button("View Details", key=f"view_{plan['plan_id']}"):
+                    st.session_state.plan_details = plan['plan_id']
+                if st.session_state.get('plan_details') == plan['plan_id']:
+                    st.markdown(plan_days_table(history.plan_days(plan['plan_id'])))
+
+        if has_more and st.button("Load more"):
+            st.session_state.plan_history_pages += 1
+            st.rerun()
 
+with calendar_tab:
+    shown = st.date_input("Month", value=date.today(), key="calendar_month")
+    month_days = history.month(shown.year, shown.month)
+    st.markdown(f"**{calendar.month_name[shown.month]} {shown.year}**")
+    st.markdown(month_calendar_html(shown.year, shown.month, month_days), unsafe_allow_html=True)
+    if not month_days:
+        st.info("No meals planned this month.")
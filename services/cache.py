@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import pickle
+import sqlite3
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from utils.defaults import SEARCH_CACHE_PATH, SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_MAX_ENTRIES
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCache:
+    """
+    SQLite-backed cache for parsed recipe search results.
+
+    Entries are keyed on a normalized form of the search parameters and store the
+    already-parsed (recipes_df, ingredients_df, nutrition_df) triple, so a hit skips
+    both the network round trip and the parse step. Entries expire after `ttl`
+    seconds and the least recently used ones are evicted once `max_entries` is exceeded.
+
+    With db_path ':memory:' one connection is kept open for the life of the cache,
+    since every new connection would see its own empty database.
+    """
+
+    def __init__(self, db_path: str = SEARCH_CACHE_PATH, ttl: int = SEARCH_CACHE_TTL_SECONDS,
+                 max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory_conn = sqlite3.connect(db_path, check_same_thread=False) if db_path == ':memory:' else None
+        self.init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return self._memory_conn or sqlite3.connect(self.db_path)
+
+    def init_db(self):
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    cache_key TEXT PRIMARY KEY NOT NULL,
+                    payload BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_search_cache_last_accessed ON search_cache (last_accessed)')
+            conn.commit()
+
+    @staticmethod
+    def make_key(params: Dict) -> str:
+        """
+        Build a stable cache key from search parameters.
+
+        Free-text values are stripped and lowercased, the comma-separated ingredient
+        list is deduplicated and sorted, and dict keys are sorted so that equivalent
+        searches map to the same key.
+        """
+        normalized = {}
+        for key, value in params.items():
+            if key == 'ingredients' and isinstance(value, str):
+                value = ",".join(sorted({name.strip().lower() for name in value.split(",") if name.strip()}))
+            elif isinstance(value, str):
+                value = value.strip().lower()
+            elif isinstance(value, dict):
+                value = {k: list(v) if isinstance(v, (list, tuple)) else v for k, v in sorted(value.items())}
+            normalized[key] = value
+        encoded = json.dumps(normalized, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple['pd.DataFrame', 'pd.DataFrame', 'pd.DataFrame']]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT payload, created_at FROM search_cache WHERE cache_key = ?', (key,)
+            ).fetchone()
+            value = None
+            if row is not None and now - row[1] <= self.ttl:
+                try:
+                    value = pickle.loads(row[0])
+                except (pickle.UnpicklingError, AttributeError, ImportError, EOFError, TypeError) as e:
+                    # Corrupt, or pickled by an incompatible pandas version; drop it and search again
+                    logger.warning("Discarding unreadable search cache entry %s: %s", key, e)
+            if value is None:
+                if row is not None:
+                    conn.execute('DELETE FROM search_cache WHERE cache_key = ?', (key,))
+                    conn.commit()
+                self.misses += 1
+                return None
+            conn.execute('UPDATE search_cache SET last_accessed = ? WHERE cache_key = ?', (now, key))
+            conn.commit()
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Tuple['pd.DataFrame', 'pd.DataFrame', 'pd.DataFrame']) -> None:
+        now = time.time()
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO search_cache (cache_key, payload, created_at, last_accessed) VALUES (?, ?, ?, ?)',
+                (key, payload, now, now)
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now: float) -> None:
+        """Drop expired entries, then the least recently used ones beyond max_entries."""
+        conn.execute('DELETE FROM search_cache WHERE created_at < ?', (now - self.ttl,))
+        conn.execute('''
+            DELETE FROM search_cache WHERE cache_key IN (
+                SELECT cache_key FROM search_cache ORDER BY last_accessed DESC LIMIT -1 OFFSET ?
+            )
+        ''', (self.max_entries,))
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            size = conn.execute('SELECT COUNT(*) FROM search_cache').fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': size}
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute('DELETE FROM search_cache')
+            conn.commit()
@@ -1,15 +1,210 @@
 import sqlite3
-from datetime import datetime
-from typing import List, Dict, Optional
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Dict, Optional, Tuple
 import json
+from services.migrations import MIGRATIONS
+from utils.defaults import SQLITE_PRAGMAS, SQLITE_POOL_SIZE
+
+def _records(data, columns: Tuple[str, ...]) -> Iterator[tuple]:
+    """Yield one value tuple per row, in `columns` order, from a DataFrame or an iterable of objects."""
+    if hasattr(data, 'itertuples'):
+        # object dtype turns numpy scalars into plain Python values sqlite3 can bind
+        frame = data.reindex(columns=list(columns)).astype(object)
+        frame = frame.where(frame.notna(), None)
+        return frame.itertuples(index=False, name=None)
+    return (tuple(getattr(item, column, None) for column in columns) for item in data)
+
+
+TABLES = ('ingredients', 'recipes', 'nutrition', 'meal_plans', 'meal_plan_entries', 'meal_plan_summaries')
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner')
+NUTRITION_COLUMNS = ('calories', 'protein', 'carbs', 'fat', 'fiber', 'cholesterol', 'sodium', 'sugar')
+
+# ORDER BY expression sorting meal types breakfast, lunch, dinner
+_MEAL_TYPE_ORDER = "CASE {column} WHEN 'breakfast' THEN 0 WHEN 'lunch' THEN 1 ELSE 2 END"
+
+_SUMMARY_COLUMNS = ('meals', 'calories', 'protein', 'carbs', 'fat', 'cost')
+
+_INGREDIENT_COLUMNS = 'id, ingredient_id, name, amount, unit, expiry_date, original_string, aisle, recipe_id'
+
+
+def _ingredient_row(cursor: sqlite3.Cursor, row: tuple) -> Dict:
+    """Row factory decoding a SELECT of _INGREDIENT_COLUMNS into an ingredient dict."""
+    row_id, ingredient_id, name, amount, unit, expiry_date, original_string, aisle, recipe_id = row
+    return {
+        'id': row_id,
+        'ingredient_id': ingredient_id,
+        'name': name,
+        'amount': amount,
+        'unit': unit,
+        'expiry_date': datetime.fromisoformat(expiry_date) if expiry_date else None,
+        'original_string': original_string,
+        'aisle': aisle,
+        'recipe_id': recipe_id
+    }
+
+
+def _sql_datetime(value) -> str:
+    """Format a date or datetime the way sqlite3 stores datetimes, so string comparisons hold."""
+    return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+
+
+def _ingredient_filters(pantry_only: Optional[bool], name_prefix: Optional[str], expiring_before,
+                        recipe_ids: Optional[List[int]]) -> Tuple[str, list]:
+    """Build the WHERE clause and parameters shared by the ingredient queries."""
+    clauses, params = [], []
+    if pantry_only is True:
+        clauses.append('recipe_id IS NULL')
+    elif pantry_only is False:
+        clauses.append('recipe_id IS NOT NULL')
+    if name_prefix:
+        # A range on lower(name) rather than LIKE, so idx_ingredients_lower_name is used
+        prefix = name_prefix.lower()
+        clauses.append('lower(name) >= ? AND lower(name) < ?')
+        params += [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+    if expiring_before is not None:
+        clauses.append('expiry_date IS NOT NULL AND expiry_date < ?')
+        params.append(_sql_datetime(expiring_before))
+    if recipe_ids is not None:
+        clause, ids = _id_filter('recipe_id', recipe_ids)
+        clauses.append(clause[len('WHERE '):])
+        params += ids
+    return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def _id_filter(column: str, ids: Optional[List[int]]) -> Tuple[str, list]:
+    """WHERE clause restricting `column` to `ids`; no clause when ids is None."""
+    if ids is None:
+        return '', []
+    ids = [int(value) for value in ids]
+    return (f'WHERE {column} IN ({", ".join("?" * len(ids))})' if ids else 'WHERE 0'), ids
+
 
 class Database:
-    def __init__(self, db_path: str = "meal_prep.db"):
+    """
+    SQLite access layer for meal_prep.db.
+
+    Connections are long-lived and kept in a small pool, so methods reuse an open
+    connection instead of reconnecting on every call. A connection is checked out by
+    one thread at a time, which keeps it safe under Streamlit's multi-threaded
+    script runner, and nested calls on the same thread reuse the connection already
+    checked out. Connections run in WAL mode with foreign keys enforced and the
+    pragmas from SQLITE_PRAGMAS.
+    Call close() (or use the Database as a context manager) to release them.
+    """
+
+    def __init__(self, db_path: str = "meal_prep.db", pragmas: Optional[Dict[str, object]] = None,
+                 pool_size: int = SQLITE_POOL_SIZE):
         self.db_path = db_path
+        self.pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+        self.pool_size = pool_size
+        self._local = threading.local()
+        self._idle: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+        self._closed = False
+        self._versions: Dict[str, int] = {table: 0 for table in TABLES}
+        self._versions_lock = threading.Lock()
         self.init_db()
+
+    def __enter__(self) -> 'Database':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # Off by default in SQLite; the meal plan tables rely on ON DELETE CASCADE
+        conn.execute('PRAGMA foreign_keys=ON')
+        for pragma, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {pragma}={value}')
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out a pooled connection for the current thread, reusing it for nested calls."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        with self._pool_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            if conn.in_transaction:
+                conn.rollback()
+            with self._pool_lock:
+                if not self._closed and len(self._idle) < self.pool_size:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def close(self) -> None:
+        """Close all idle pooled connections; connections in use are closed when returned."""
+        with self._pool_lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run the enclosed writes as one transaction, committed once on exit.
+
+        Nested transaction() blocks on the same thread join the outermost one, so
+        write methods called inside a transaction do not commit on their own.
+        """
+        with self._connection() as conn:
+            depth = getattr(self._local, 'tx_depth', 0)
+            self._local.tx_depth = depth + 1
+            if depth == 0:
+                self._local.touched = set()
+            try:
+                yield conn
+                if depth == 0:
+                    conn.commit()
+                    self._bump(self._local.touched)
+            except BaseException:
+                if depth == 0:
+                    conn.rollback()
+                raise
+            finally:
+                self._local.tx_depth = depth
+
+    def _touch(self, *tables: str) -> None:
+        """Mark tables as written by the current transaction; their versions move on commit."""
+        self._local.touched.update(tables)
+
+    def _bump(self, tables) -> None:
+        with self._versions_lock:
+            for table in tables:
+                self._versions[table] += 1
+
+    def table_versions(self, *tables: str) -> Tuple[int, ...]:
+        """
+        Write counters for the given tables, bumped each time a write to them commits
+        through this Database. Read caches compare them to detect stale entries.
+        """
+        with self._versions_lock:
+            return tuple(self._versions[table] for table in tables)
     
     def init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
+            if conn.execute('PRAGMA user_version').fetchone()[0] == len(MIGRATIONS):
+                return  # Schema already current; skip the CREATE TABLE round trips
             cursor = conn.cursor()
             
             # Create ingredients table
@@ -68,47 +263,165 @@ class Database:
             ''')
             
             conn.commit()
+
+        self.migrate()
+
+    def schema_version(self) -> int:
+        with self._connection() as conn:
+            return conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def migrate(self) -> int:
+        """
+        Apply pending migrations from services.migrations in order, then ANALYZE.
+
+        Migrations run inside one BEGIN IMMEDIATE transaction, so concurrent processes
+        cannot apply the same migration twice and a failing migration leaves the
+        schema version unchanged.
+
+        Returns:
+            int: The schema version after migrating
+        """
+        with self._connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                version = conn.execute('PRAGMA user_version').fetchone()[0]
+                pending = MIGRATIONS[version:]
+                for number, statements in enumerate(pending, start=version + 1):
+                    for statement in statements:
+                        conn.execute(statement)
+                    conn.execute(f'PRAGMA user_version = {number}')
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+            if pending:
+                conn.execute('ANALYZE')
+                conn.commit()
+                self._bump(TABLES)
+            return version + len(pending)
     
     def add_ingredient(self, ingredient) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
+            self._touch('ingredients')
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO ingredients (ingredient_id, name, amount, unit, expiry_date, original_string, aisle, recipe_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
                 (ingredient.ingredient_id, ingredient.name, ingredient.amount, ingredient.unit, ingredient.expiry_date, ingredient.original_string, ingredient.aisle, ingredient.recipe_id)
             )
-            conn.commit()
             return cursor.lastrowid
     
-    def get_ingredients(self) -> List[Dict]:
-        with sqlite3.connect(self.db_path) as conn:
+    def get_ingredients(self, pantry_only: Optional[bool] = None, name_prefix: Optional[str] = None,
+                        expiring_before: Optional[datetime] = None, recipe_ids: Optional[List[int]] = None,
+                        limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """
+        Fetch ingredient rows, optionally filtered and paginated in SQL.
+
+        Args:
+            pantry_only: True for pantry items only (no recipe_id), False for recipe
+                ingredients only, None for both
+            name_prefix: Case-insensitive prefix the ingredient name must start with
+            expiring_before: Only items with an expiry date before this date
+            recipe_ids: Only ingredients belonging to these recipes
+            limit: Maximum number of rows to return, or None for all
+            offset: Number of matching rows to skip
+
+        Returns:
+            List[Dict]: Ingredient rows ordered by insertion
+        """
+        where, params = _ingredient_filters(pantry_only, name_prefix, expiring_before, recipe_ids)
+        query = f'SELECT {_INGREDIENT_COLUMNS} FROM ingredients {where} ORDER BY id'
+        if limit is not None:
+            query += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        with self._connection() as conn:
             cursor = conn.cursor()
-            
-            # Get column names
-            cursor.execute('PRAGMA table_info(ingredients)')
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            cursor.execute('SELECT * FROM ingredients')
-            rows = cursor.fetchall()
-            
-            return [
-                {
-                    'ingredient_id': row[columns.index('ingredient_id')],
-                    'name': row[columns.index('name')],
-                    'amount': row[columns.index('amount')],
-                    'unit': row[columns.index('unit')],
-                    'expiry_date': datetime.fromisoformat(row[columns.index('expiry_date')]) if row[columns.index('expiry_date')] else None,
-                    'original_string': row[columns.index('original_string')],
-                    'aisle': row[columns.index('aisle')],
-                    'recipe_id': row[columns.index('recipe_id')]
-                }
-                for row in rows
-            ]
+            cursor.row_factory = _ingredient_row
+            return cursor.execute(query, params).fetchall()
+
+    def iter_ingredients(self, pantry_only: Optional[bool] = None, name_prefix: Optional[str] = None,
+                         expiring_before: Optional[datetime] = None, recipe_ids: Optional[List[int]] = None,
+                         batch_size: int = 500) -> Iterator[Dict]:
+        """
+        Stream ingredient rows in batches of `batch_size` using keyset pagination on id.
+
+        Accepts the same filters as get_ingredients. The connection is released
+        between batches, so the generator can be consumed lazily.
+        """
+        where, params = _ingredient_filters(pantry_only, name_prefix, expiring_before, recipe_ids)
+        keyset = 'AND id > ?' if where else 'WHERE id > ?'
+        query = f'SELECT {_INGREDIENT_COLUMNS} FROM ingredients {where} {keyset} ORDER BY id LIMIT ?'
+        last_id = 0
+        while True:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = _ingredient_row
+                batch = cursor.execute(query, params + [last_id, batch_size]).fetchall()
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1]['id']
+
+    def get_ingredient_names(self, pantry_only: Optional[bool] = None) -> List[str]:
+        """Return the distinct lowercased ingredient names, sorted, computed in SQL."""
+        where, params = _ingredient_filters(pantry_only, None, None, None)
+        with self._connection() as conn:
+            rows = conn.execute(f'SELECT DISTINCT lower(name) FROM ingredients {where} ORDER BY 1', params).fetchall()
+        return [row[0] for row in rows]
+
+    def get_ingredient_ids(self) -> Dict[str, int]:
+        """Map lowercased ingredient names to their Spoonacular ingredient_id, where one was saved."""
+        with self._connection() as conn:
+            rows = conn.execute('''
+                SELECT lower(name), MIN(ingredient_id) FROM ingredients
+                WHERE ingredient_id > 0
+                GROUP BY lower(name)
+            ''').fetchall()
+        return dict(rows)
+
+    def get_expiring_ingredients(self, within_days: int, now: Optional[datetime] = None) -> List[Dict]:
+        """Return pantry items expiring within `within_days` days of `now`, soonest first."""
+        cutoff = (now or datetime.now()) + timedelta(days=within_days)
+        where, params = _ingredient_filters(True, None, cutoff, None)
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = _ingredient_row
+            return cursor.execute(
+                f'SELECT {_INGREDIENT_COLUMNS} FROM ingredients {where} ORDER BY expiry_date, id', params
+            ).fetchall()
+
+    def get_ingredient_totals(self, pantry_only: Optional[bool] = True) -> List[Dict]:
+        """
+        Return summed quantities per (lowercased name, unit).
+
+        Each row has 'name', 'unit', 'amount' (the sum), 'items' (row count) and
+        'earliest_expiry' (datetime or None).
+        """
+        where, params = _ingredient_filters(pantry_only, None, None, None)
+        with self._connection() as conn:
+            rows = conn.execute(f'''
+                SELECT lower(name), unit, SUM(amount), COUNT(*), MIN(expiry_date)
+                FROM ingredients {where}
+                GROUP BY lower(name), unit
+                ORDER BY 1, 2
+            ''', params).fetchall()
+        return [
+            {
+                'name': name,
+                'unit': unit,
+                'amount': amount,
+                'items': items,
+                'earliest_expiry': datetime.fromisoformat(earliest_expiry) if earliest_expiry else None
+            }
+            for name, unit, amount, items, earliest_expiry in rows
+        ]
 
     def add_nutrition(self, nutrition) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
+            self._touch('nutrition')
             cursor = conn.cursor()
             cursor.execute(
-                'INSERT INTO nutrition (recipe_id, calories, protein, carbs, fat, fiber, cholesterol, sodium) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                'INSERT INTO nutrition (recipe_id, calories, protein, carbs, fat, fiber, cholesterol, sodium, sugar) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
                 (
                     nutrition.recipe_id,
                     nutrition.calories,
@@ -117,14 +430,15 @@ class Database:
                     nutrition.fat,
                     nutrition.fiber,
                     nutrition.cholesterol,
-                    nutrition.sodium
+                    nutrition.sodium,
+                    nutrition.sugar
                 )
             )
-            conn.commit()
             return cursor.lastrowid
     
     def add_recipe(self, recipe) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
+            self._touch('recipes')
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO recipes (recipe_id, recipe_name, source_url, total_cost, prep_time, image_url, servings) VALUES (?, ?, ?, ?, ?, ?, ?)',
@@ -138,13 +452,13 @@ class Database:
                     recipe.servings
                 )
             )
-            conn.commit()
             return cursor.lastrowid
     
-    def get_recipes(self) -> List[Dict]:
-        with sqlite3.connect(self.db_path) as conn:
+    def get_recipes(self, recipe_ids: Optional[List[int]] = None) -> List[Dict]:
+        where, params = _id_filter('recipe_id', recipe_ids)
+        with self._connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM recipes')
+            cursor.execute(f'SELECT recipe_id, recipe_name, source_url, total_cost, prep_time, image_url, servings FROM recipes {where}', params)
             rows = cursor.fetchall()
             return [
                 {
@@ -159,22 +473,406 @@ class Database:
                 for row in rows
             ] 
 
+    def get_nutrition(self, recipe_ids: Optional[List[int]] = None) -> List[Dict]:
+        where, params = _id_filter('recipe_id', recipe_ids)
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT recipe_id, calories, protein, carbs, fat, fiber, cholesterol, sodium, sugar FROM nutrition {where}', params)
+            return [
+                {
+                    'recipe_id': row[0],
+                    'calories': row[1],
+                    'protein': row[2],
+                    'carbs': row[3],
+                    'fat': row[4],
+                    'fiber': row[5],
+                    'cholesterol': row[6],
+                    'sodium': row[7],
+                    'sugar': row[8]
+                }
+                for row in cursor.fetchall()
+            ]
+
+    def search_recipes(self, match: Optional[str], pantry_names: List[str], max_ready_time: Optional[int] = None,
+                       nutrient_ranges: Optional[Dict[str, Tuple[float, float]]] = None) -> List[Dict]:
+        """
+        Full-text search over saved recipes by recipe name and ingredient names.
+
+        Args:
+            match: FTS5 MATCH expression, or None to consider every saved recipe
+            pantry_names: Lowercased pantry ingredient names used to count overlap
+            max_ready_time: Only recipes with prep_time at most this many minutes
+            nutrient_ranges: (min, max) per nutrition column; recipes without
+                nutrition data are not excluded
+
+        Returns:
+            List[Dict]: One row per matching recipe with 'recipe_id', 'bm25' (lower is
+                more relevant, 0 without a query), 'prep_time', 'used_ingredients' and
+                'total_ingredients'
+        """
+        hit_params, clauses, params = [], [], []
+        if match:
+            # Name matches count double relative to ingredient matches
+            hits = '''
+                SELECT recipe_id, MIN(score) AS bm25 FROM (
+                    SELECT rowid AS recipe_id, 2 * bm25(recipes_fts) AS score FROM recipes_fts WHERE recipes_fts MATCH ?
+                    UNION ALL
+                    SELECT i.recipe_id, f.score FROM (
+                        SELECT rowid AS id, bm25(ingredients_fts) AS score FROM ingredients_fts WHERE ingredients_fts MATCH ?
+                    ) AS f JOIN ingredients AS i ON i.id = f.id
+                    WHERE i.recipe_id IS NOT NULL
+                ) GROUP BY recipe_id
+            '''
+            hit_params = [match, match]
+        else:
+            hits = 'SELECT recipe_id, 0.0 AS bm25 FROM recipes'
+        if max_ready_time is not None:
+            clauses.append('r.prep_time <= ?')
+            params.append(max_ready_time)
+        for column, (minimum, maximum) in (nutrient_ranges or {}).items():
+            if column not in NUTRITION_COLUMNS:
+                raise ValueError(f"Unknown nutrient: {column}")
+            clauses.append(f'(n.recipe_id IS NULL OR n.{column} IS NULL OR n.{column} BETWEEN ? AND ?)')
+            params += [minimum, maximum]
+        where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+
+        with self._connection() as conn:
+            rows = conn.execute(f'''
+                WITH hits AS ({hits}),
+                pantry AS (SELECT value AS name FROM json_each(?)),
+                overlap AS (
+                    SELECT i.recipe_id,
+                           COUNT(*) AS total_ingredients,
+                           SUM(lower(i.name) IN (SELECT name FROM pantry)) AS used_ingredients
+                    FROM ingredients AS i
+                    WHERE i.recipe_id IN (SELECT recipe_id FROM hits)
+                    GROUP BY i.recipe_id
+                )
+                SELECT h.recipe_id, h.bm25, r.prep_time, COALESCE(o.used_ingredients, 0), COALESCE(o.total_ingredients, 0)
+                FROM hits AS h
+                JOIN recipes AS r ON r.recipe_id = h.recipe_id
+                LEFT JOIN nutrition AS n ON n.recipe_id = h.recipe_id
+                LEFT JOIN overlap AS o ON o.recipe_id = h.recipe_id
+                {where}
+            ''', hit_params + [json.dumps(pantry_names)] + params).fetchall()
+        return [
+            {'recipe_id': recipe_id, 'bm25': bm25, 'prep_time': prep_time, 'used_ingredients': used, 'total_ingredients': total}
+            for recipe_id, bm25, prep_time, used, total in rows
+        ]
+
+    def add_recipes(self, recipes) -> int:
+        """
+        Insert or replace many recipes in one transaction.
+
+        Args:
+            recipes: Either a recipes DataFrame as produced by SpoonacularAPI.parse_recipe_data
+                (indexed by recipe_id, with a 'name' column) or an iterable of Recipe objects.
+
+        Returns:
+            int: Number of rows written
+        """
+        columns = ('recipe_id', 'recipe_name', 'source_url', 'total_cost', 'prep_time', 'image_url', 'servings')
+        if hasattr(recipes, 'itertuples'):
+            recipes = recipes.reset_index().rename(columns={'name': 'recipe_name'})
+        with self.transaction() as conn:
+            self._touch('recipes')
+            # An upsert rather than INSERT OR REPLACE, so the UPDATE trigger keeps recipes_fts in sync
+            cursor = conn.executemany(
+                '''INSERT INTO recipes (recipe_id, recipe_name, source_url, total_cost, prep_time, image_url, servings) VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (recipe_id) DO UPDATE SET
+                       recipe_name = excluded.recipe_name, source_url = excluded.source_url, total_cost = excluded.total_cost,
+                       prep_time = excluded.prep_time, image_url = excluded.image_url, servings = excluded.servings''',
+                _records(recipes, columns)
+            )
+            return cursor.rowcount
+
+    def add_ingredients(self, ingredients) -> int:
+        """
+        Insert many ingredient rows in one transaction.
+
+        Args:
+            ingredients: Either an ingredients DataFrame as produced by
+                SpoonacularAPI.parse_recipe_data or an iterable of Ingredient objects.
+                Missing DataFrame columns (e.g. expiry_date) are stored as NULL.
+
+        Returns:
+            int: Number of rows written
+        """
+        columns = ('ingredient_id', 'name', 'amount', 'unit', 'expiry_date', 'original_string', 'aisle', 'recipe_id')
+        with self.transaction() as conn:
+            self._touch('ingredients')
+            cursor = conn.executemany(
+                'INSERT INTO ingredients (ingredient_id, name, amount, unit, expiry_date, original_string, aisle, recipe_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                _records(ingredients, columns)
+            )
+            return cursor.rowcount
+
+    def delete_recipe_ingredients(self, recipe_ids: List[int]) -> int:
+        """Delete the stored ingredient rows of the given recipes, leaving pantry items untouched."""
+        with self.transaction() as conn:
+            self._touch('ingredients')
+            cursor = conn.executemany(
+                'DELETE FROM ingredients WHERE recipe_id = ?',
+                ((int(recipe_id),) for recipe_id in recipe_ids)
+            )
+            return cursor.rowcount
+
+    def consume_ingredient(self, item_id: int, amount: Optional[float] = None) -> Optional[float]:
+        """
+        Use up `amount` of a pantry item, deleting it once nothing is left.
+
+        Args:
+            item_id: Row id of the pantry item
+            amount: Quantity used, in the item's unit; None uses all of it
+
+        Returns:
+            Optional[float]: The amount left, or None if the item was used up or not found
+        """
+        with self.transaction() as conn:
+            row = conn.execute(
+                'SELECT amount FROM ingredients WHERE id = ? AND recipe_id IS NULL', (item_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._touch('ingredients')
+            if amount is None or row[0] - amount <= 0:
+                conn.execute('DELETE FROM ingredients WHERE id = ?', (item_id,))
+                return None
+            conn.execute('UPDATE ingredients SET amount = ? WHERE id = ?', (row[0] - amount, item_id))
+            return row[0] - amount
+
+    def add_nutrition_rows(self, nutrition) -> int:
+        """
+        Insert or replace nutrition data for many recipes in one transaction.
+
+        Args:
+            nutrition: Either a nutrition DataFrame as produced by SpoonacularAPI.parse_recipe_data
+                (indexed by recipe_id) or an iterable of Nutrition objects.
+
+        Returns:
+            int: Number of rows written
+        """
+        columns = ('recipe_id', 'calories', 'protein', 'carbs', 'fat', 'fiber', 'cholesterol', 'sodium', 'sugar')
+        if hasattr(nutrition, 'itertuples'):
+            nutrition = nutrition.reset_index()
+        with self.transaction() as conn:
+            self._touch('nutrition')
+            cursor = conn.executemany(
+                'INSERT OR REPLACE INTO nutrition (recipe_id, calories, protein, carbs, fat, fiber, cholesterol, sodium, sugar) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                _records(nutrition, columns)
+            )
+            return cursor.rowcount
+
     def add_meal_plan(self, meal_plan):
-        with sqlite3.connect(self.db_path) as conn:
+        """
+        Save a meal plan, keeping the JSON meal lists on meal_plans and writing one
+        meal_plan_entries row per planned meal for indexed history queries, plus its
+        per-day and whole-plan totals from the recipes and nutrition already stored.
+
+        Returns:
+            int: The id of the new meal plan row
+        """
+        with self.transaction() as conn:
+            self._touch('meal_plans', 'meal_plan_entries')
             cursor = conn.cursor()
             cursor.execute('INSERT INTO meal_plans (start_date, num_days, breakfast, lunch, dinner) VALUES (?, ?, ?, ?, ?)', (meal_plan.start_date, meal_plan.num_days, json.dumps(meal_plan.breakfast), json.dumps(meal_plan.lunch), json.dumps(meal_plan.dinner)))
-            conn.commit()   
-            return cursor.lastrowid
-            
+            plan_id = cursor.lastrowid
+            start = date.fromisoformat(str(meal_plan.start_date)[:10])
+            conn.executemany(
+                'INSERT INTO meal_plan_entries (plan_id, date, meal_type, position, recipe_id) VALUES (?, ?, ?, ?, ?)',
+                (
+                    (plan_id, (start + timedelta(days=day)).isoformat(), meal_type, position, int(recipe_id))
+                    for meal_type in MEAL_TYPES
+                    for day, meals in enumerate(getattr(meal_plan, meal_type))
+                    for position, recipe_id in enumerate(meals)
+                )
+            )
+            self._add_meal_plan_summaries(conn, plan_id)
+            return plan_id
+
+    def _add_meal_plan_summaries(self, conn: sqlite3.Connection, plan_id: int) -> None:
+        """(Re)compute a plan's rows in meal_plan_day_summaries and meal_plan_summaries."""
+        self._touch('meal_plan_summaries')
+        conn.execute('DELETE FROM meal_plan_day_summaries WHERE plan_id = ?', (plan_id,))
+        conn.execute('''
+            INSERT INTO meal_plan_day_summaries (plan_id, date, meals, calories, protein, carbs, fat, cost)
+            SELECT entry.plan_id, entry.date, COUNT(*), TOTAL(nutrition.calories), TOTAL(nutrition.protein),
+                   TOTAL(nutrition.carbs), TOTAL(nutrition.fat), TOTAL(recipe.total_cost)
+            FROM meal_plan_entries AS entry
+            LEFT JOIN nutrition ON nutrition.recipe_id = entry.recipe_id
+            LEFT JOIN recipes AS recipe ON recipe.recipe_id = entry.recipe_id
+            WHERE entry.plan_id = ?
+            GROUP BY entry.date
+        ''', (plan_id,))
+        conn.execute('''
+            INSERT OR REPLACE INTO meal_plan_summaries (plan_id, start_date, num_days, meals, calories, protein, carbs, fat, cost)
+            SELECT plan.id, plan.start_date, plan.num_days, COALESCE(SUM(day.meals), 0), TOTAL(day.calories),
+                   TOTAL(day.protein), TOTAL(day.carbs), TOTAL(day.fat), TOTAL(day.cost)
+            FROM meal_plans AS plan
+            LEFT JOIN meal_plan_day_summaries AS day ON day.plan_id = plan.id
+            WHERE plan.id = ?
+            GROUP BY plan.id
+        ''', (plan_id,))
+
+
+    def get_meal_plans(self) -> List[Dict]:
+        """Return saved meal plans, newest first, with the meal lists decoded from JSON."""
+        with self._connection() as conn:
+            rows = conn.execute(
+                'SELECT id, start_date, num_days, breakfast, lunch, dinner FROM meal_plans ORDER BY start_date DESC, id DESC'
+            ).fetchall()
+        return [
+            {
+                'id': plan_id,
+                'start_date': start_date,
+                'num_days': num_days,
+                'breakfast': json.loads(breakfast),
+                'lunch': json.loads(lunch),
+                'dinner': json.loads(dinner)
+            }
+            for plan_id, start_date, num_days, breakfast, lunch, dinner in rows
+        ]
+
+    def get_meal_plan(self, plan_id: int) -> Optional[Dict]:
+        """
+        Return one saved plan with its meals, read in a single query over the
+        meal_plan_entries primary key.
+
+        Returns:
+            Optional[Dict]: id, start_date, num_days and 'entries' (dicts with date,
+                meal_type and recipe_id, ordered by date, meal type and position),
+                or None if there is no such plan
+        """
+        with self._connection() as conn:
+            rows = conn.execute(f'''
+                SELECT plan.start_date, plan.num_days, entry.date, entry.meal_type, entry.recipe_id
+                FROM meal_plans AS plan
+                LEFT JOIN meal_plan_entries AS entry ON entry.plan_id = plan.id
+                WHERE plan.id = ?
+                ORDER BY entry.date, {_MEAL_TYPE_ORDER.format(column='entry.meal_type')}, entry.position
+            ''', (plan_id,)).fetchall()
+        if not rows:
+            return None
+        return {
+            'id': plan_id,
+            'start_date': rows[0][0],
+            'num_days': rows[0][1],
+            'entries': [
+                {'date': entry_date, 'meal_type': meal_type, 'recipe_id': recipe_id}
+                for _, _, entry_date, meal_type, recipe_id in rows
+                if entry_date is not None
+            ]
+        }
+
+    def get_meal_plan_entries(self, start_date=None, end_date=None, recipe_id: Optional[int] = None) -> List[Dict]:
+        """
+        Return planned meals across all saved plans, e.g. what was planned on a date
+        or which plans used a recipe, from the meal_plan_entries indexes.
+
+        Args:
+            start_date: First date to include (date, datetime or 'YYYY-MM-DD'), or None
+            end_date: Last date to include, or None
+            recipe_id: Only meals of this recipe, or None for all
+
+        Returns:
+            List[Dict]: Entries with plan_id, date, meal_type and recipe_id, ordered by
+                date, meal type, plan and position
+        """
+        clauses, params = [], []
+        if recipe_id is not None:
+            clauses.append('recipe_id = ?')
+            params.append(int(recipe_id))
+        if start_date is not None:
+            clauses.append('date >= ?')
+            params.append(str(start_date)[:10])
+        if end_date is not None:
+            clauses.append('date <= ?')
+            params.append(str(end_date)[:10])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._connection() as conn:
+            rows = conn.execute(f'''
+                SELECT plan_id, date, meal_type, recipe_id FROM meal_plan_entries {where}
+                ORDER BY date, {_MEAL_TYPE_ORDER.format(column='meal_type')}, plan_id, position
+            ''', params).fetchall()
+        return [
+            {'plan_id': plan_id, 'date': entry_date, 'meal_type': meal_type, 'recipe_id': entry_recipe_id}
+            for plan_id, entry_date, meal_type, entry_recipe_id in rows
+        ]
+
+    def get_meal_plan_ids(self, recipe_id: int) -> List[int]:
+        """Return the ids of saved plans that use a recipe, newest first."""
+        with self._connection() as conn:
+            rows = conn.execute(
+                'SELECT DISTINCT plan_id FROM meal_plan_entries WHERE recipe_id = ? ORDER BY plan_id DESC', (int(recipe_id),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_meal_plan_summaries(self, before: Optional[Tuple[str, int]] = None, limit: int = 20) -> List[Dict]:
+        """
+        Return saved plans' precomputed totals, newest first, one page at a time.
+
+        Pages are keyset-paginated on (start_date, plan_id): pass the last row's
+        (start_date, plan_id) as `before` to get the next page, so each page is an
+        index range scan however deep into the history it is.
+
+        Returns:
+            List[Dict]: Up to `limit` rows with plan_id, start_date, num_days, meals,
+                calories, protein, carbs, fat and cost
+        """
+        where, params = '', []
+        if before is not None:
+            where = 'WHERE (start_date, plan_id) < (?, ?)'
+            params = [before[0], int(before[1])]
+        with self._connection() as conn:
+            rows = conn.execute(f'''
+                SELECT plan_id, start_date, num_days, {', '.join(_SUMMARY_COLUMNS)} FROM meal_plan_summaries
+                {where}
+                ORDER BY start_date DESC, plan_id DESC
+                LIMIT ?
+            ''', params + [limit]).fetchall()
+        return [
+            {'plan_id': row[0], 'start_date': row[1], 'num_days': row[2], **dict(zip(_SUMMARY_COLUMNS, row[3:]))}
+            for row in rows
+        ]
+
+    def get_meal_plan_day_summaries(self, plan_id: Optional[int] = None, start_date=None, end_date=None) -> List[Dict]:
+        """
+        Return precomputed per-day totals for one plan and/or a date range across plans.
+
+        Returns:
+            List[Dict]: Rows with plan_id, date, meals, calories, protein, carbs, fat
+                and cost, ordered by date then plan
+        """
+        clauses, params = [], []
+        if plan_id is not None:
+            clauses.append('plan_id = ?')
+            params.append(int(plan_id))
+        if start_date is not None:
+            clauses.append('date >= ?')
+            params.append(str(start_date)[:10])
+        if end_date is not None:
+            clauses.append('date <= ?')
+            params.append(str(end_date)[:10])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._connection() as conn:
+            rows = conn.execute(f'''
+                SELECT plan_id, date, {', '.join(_SUMMARY_COLUMNS)} FROM meal_plan_day_summaries {where}
+                ORDER BY date, plan_id
+            ''', params).fetchall()
+        return [{'plan_id': row[0], 'date': row[1], **dict(zip(_SUMMARY_COLUMNS, row[2:]))} for row in rows]
 
     def clear_database(self):
         """Clear all data from the database."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.executescript('''
+                DELETE FROM meal_plan_day_summaries;
+                DELETE FROM meal_plan_summaries;
+                DELETE FROM meal_plan_entries;
                 DELETE FROM meal_plans;
+                DELETE FROM nutrition;
                 DELETE FROM recipes;
                 DELETE FROM ingredients;
-                DELETE FROM nutrition;
                 DELETE FROM sqlite_sequence;  -- This resets auto-increment counters
-            ''')            
\ No newline at end of file
+            ''')            
+        self._bump(TABLES)
@@ -0,0 +1,150 @@
+import threading
+import weakref
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from services.ingredient_names import normalize_ingredient_name
+from utils.defaults import EXPIRY_PRIORITY_DAYS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# (expiry_date, row id)
+ExpiryKey = Tuple[datetime, int]
+
+
+class ExpiryIndex:
+    """
+    Pantry items ordered by expiry date.
+
+    Keys are kept in a sorted list, so "what expires before X" is a binary search
+    and a prefix slice rather than a scan of the inventory. Items without an expiry
+    date never spoil and are not indexed.
+
+    An index built with from_database mirrors that Database: every read first
+    compares db.table_versions('ingredients') with the version it was loaded at and
+    reloads after any committed pantry write, from any session. Only items expiring
+    within the window being read (plus a day of slack) are loaded, through the
+    expiry_date index behind Database.get_expiring_ingredients, so a reload never
+    scans the whole inventory. Use expiry_index(db) to share one index between every
+    session using the same Database.
+
+    Items are dicts as returned by Database.get_ingredients, with at least 'id',
+    'name', 'amount', 'unit' and 'expiry_date'.
+    """
+
+    def __init__(self, items: Iterable[Dict] = (), db=None):
+        self.db = db
+        self._version: Optional[Tuple[int, ...]] = None
+        # Latest expiry date covered by the loaded items; items given directly are complete
+        self._cutoff = datetime.min if db is not None else datetime.max
+        self._lock = threading.Lock()
+        self._load(items)
+
+    @classmethod
+    def from_database(cls, db) -> 'ExpiryIndex':
+        return cls(db=db).refresh()
+
+    def _load(self, items: Iterable[Dict]) -> None:
+        indexed = {item['id']: dict(item) for item in items if item.get('expiry_date') is not None}
+        keys = sorted((item['expiry_date'], item_id) for item_id, item in indexed.items())
+        self._items, self._keys = indexed, keys
+
+    def refresh(self, cutoff: Optional[datetime] = None) -> 'ExpiryIndex':
+        """
+        Reload from the database if a pantry write has committed since the last load,
+        or if items expiring up to `cutoff` (default: EXPIRY_PRIORITY_DAYS from now)
+        are not loaded yet.
+        """
+        if self.db is None:
+            return self
+        cutoff = cutoff or datetime.now() + timedelta(days=EXPIRY_PRIORITY_DAYS)
+        with self._lock:
+            # Take the version before reading, so a write that commits mid-read triggers another reload
+            version = self.db.table_versions('ingredients')
+            if version != self._version or cutoff > self._cutoff:
+                now = datetime.now()
+                within_days = max((cutoff - now).days + 1, EXPIRY_PRIORITY_DAYS) + 1
+                self._load(self.db.get_expiring_ingredients(within_days, now))
+                self._version = version
+                self._cutoff = now + timedelta(days=within_days)
+        return self
+
+    def _snapshot(self, cutoff: Optional[datetime] = None) -> Tuple[Dict[int, Dict], List[ExpiryKey]]:
+        self.refresh(cutoff)
+        with self._lock:
+            return self._items, self._keys
+
+    def __len__(self) -> int:
+        """Number of items loaded; for a database-backed index, those inside the default window."""
+        return len(self._snapshot()[1])
+
+    def expiring(self, within_days: int, now: Optional[datetime] = None) -> List[Dict]:
+        """Items expiring before `now` + within_days (including already expired ones), soonest first."""
+        cutoff = (now or datetime.now()) + timedelta(days=within_days)
+        items, keys = self._snapshot(cutoff)
+        end = bisect_left(keys, (cutoff, -1))
+        return [items[item_id] for _, item_id in keys[:end]]
+
+    def weights(self, now: Optional[datetime] = None, horizon_days: int = EXPIRY_PRIORITY_DAYS) -> Dict[str, float]:
+        """
+        Urgency per normalized ingredient name for stock that has not spoiled yet
+        but will within `horizon_days`: 1 for items expiring now, falling linearly
+        to 0 at the horizon. Only the slice of the index inside the window is read.
+        """
+        now = now or datetime.now()
+        items, keys = self._snapshot(now + timedelta(days=horizon_days))
+        start = bisect_right(keys, (now, float('inf')))
+        end = bisect_left(keys, (now + timedelta(days=horizon_days), -1))
+        horizon = horizon_days * 86400.0
+        urgency: Dict[str, float] = {}
+        for expiry_date, item_id in keys[start:end]:
+            name = normalize_ingredient_name(items[item_id]['name'])
+            weight = 1.0 - (expiry_date - now).total_seconds() / horizon
+            urgency[name] = max(urgency.get(name, 0.0), weight)
+        return urgency
+
+    def score(self, ingredients_df: 'pd.DataFrame', recipe_ids: Optional[Iterable[int]] = None,
+              now: Optional[datetime] = None, horizon_days: int = EXPIRY_PRIORITY_DAYS) -> 'pd.Series':
+        """
+        Score recipes by how much soon-to-expire stock they use.
+
+        Args:
+            ingredients_df: Recipe ingredients with 'recipe_id' and 'name'
+            recipe_ids: Recipes to score, in order; defaults to those in ingredients_df
+            now: Reference time, defaults to the current time
+            horizon_days: How far ahead stock counts as expiring
+
+        Returns:
+            pd.Series: 'expiry_score' per recipe_id, the summed urgency of the distinct
+                expiring ingredients each recipe uses (0 when none)
+        """
+        import pandas as pd
+
+        if recipe_ids is None:
+            recipe_ids = pd.unique(ingredients_df['recipe_id']) if not ingredients_df.empty else []
+        index = pd.Index(list(recipe_ids), name='recipe_id')
+        urgency = self.weights(now, horizon_days)
+        if not urgency or ingredients_df.empty:
+            return pd.Series(0.0, index=index, name='expiry_score')
+
+        codes, uniques = pd.factorize(ingredients_df['name'].astype(str))
+        names = pd.Index([normalize_ingredient_name(name) for name in uniques])[codes]
+        weights = pd.Series(names.map(urgency), index=ingredients_df.index).fillna(0.0)
+        used = pd.DataFrame({'recipe_id': ingredients_df['recipe_id'], 'name': names, 'weight': weights})
+        used = used[used['weight'] > 0].drop_duplicates(['recipe_id', 'name'])
+        scores = used.groupby('recipe_id')['weight'].sum()
+        return scores.reindex(index, fill_value=0.0).rename('expiry_score')
+
+
+_instances: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_instances_lock = threading.Lock()
+
+
+def expiry_index(db) -> ExpiryIndex:
+    """Return the ExpiryIndex shared by everything that reads from `db`."""
+    with _instances_lock:
+        index = _instances.get(db)
+        if index is None:
+            index = _instances[db] = ExpiryIndex(db=db)
+        return index
@@ -0,0 +1,235 @@
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from utils.defaults import (IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_THUMBNAIL_SIZE, IMAGE_FETCH_CONCURRENCY,
+                            IMAGE_FAILURE_TTL_SECONDS, IMAGE_INDEX_TIMEOUT_SECONDS, HTTP_TIMEOUT)
+
+logger = logging.getLogger(__name__)
+
+# Downloads the image at a URL and returns its bytes, raising OSError (e.g. requests.RequestException) on failure
+Fetcher = Callable[[str], bytes]
+
+
+def fetch_image(url: str) -> bytes:
+    """Download an image through the pooled Spoonacular HTTP session."""
+    from services.spoonacular import get_session
+    response = get_session().get(url, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
+class ImageCache:
+    """
+    On-disk cache of resized recipe images.
+
+    Each source image is downloaded once, shrunk with PIL to fit the requested size
+    and stored as a JPEG named after the SHA-256 of its bytes, so identical
+    thumbnails share one file. A SQLite index maps (url, size) to a digest and tracks
+    when each file was last used; once the files exceed `max_bytes` the least
+    recently used ones are deleted.
+
+    Thumbnails are handed to st.image as bytes, which Streamlit serves from a
+    content-hashed /media/ URL the browser can cache across reruns.
+
+    Downloads go through `fetcher`, so tests can serve images from local files.
+    Failed URLs are not retried for `failure_ttl` seconds. The index runs in WAL
+    mode so prefetch workers can write it concurrently; if it still cannot be read
+    or written, the image is treated as a cache miss rather than failing the page.
+    """
+
+    def __init__(self, cache_dir: str = IMAGE_CACHE_DIR, max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+                 fetcher: Optional[Fetcher] = None, failure_ttl: int = IMAGE_FAILURE_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fetcher = fetcher or fetch_image
+        self.failure_ttl = failure_ttl
+        self.db_path = os.path.join(cache_dir, 'index.db')
+        self.hits = 0
+        self.misses = 0
+        self._failures: Dict[Tuple[str, Tuple[int, int]], float] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=IMAGE_INDEX_TIMEOUT_SECONDS)
+
+    def init_db(self):
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS thumbnails (
+                    digest TEXT PRIMARY KEY NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS images (
+                    url TEXT NOT NULL,
+                    width INTEGER NOT NULL,
+                    height INTEGER NOT NULL,
+                    digest TEXT NOT NULL,
+                    PRIMARY KEY (url, width, height)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_thumbnails_last_accessed ON thumbnails (last_accessed)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_images_digest ON images (digest)')
+            conn.commit()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.jpg")
+
+    @staticmethod
+    def make_thumbnail(data: bytes, size: Tuple[int, int]) -> bytes:
+        """Shrink an image to fit within `size`, keeping its aspect ratio, and encode it as JPEG."""
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail(size)
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+            output = io.BytesIO()
+            image.save(output, format='JPEG', quality=85, optimize=True)
+        return output.getvalue()
+
+    def _lookup(self, url: str, size: Tuple[int, int]) -> Optional[bytes]:
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT digest FROM images WHERE url = ? AND width = ? AND height = ?', (url, *size)
+            ).fetchone()
+            if row is None:
+                return None
+            try:
+                with open(self._path(row[0]), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                conn.execute('DELETE FROM images WHERE digest = ?', (row[0],))
+                conn.execute('DELETE FROM thumbnails WHERE digest = ?', (row[0],))
+                conn.commit()
+                return None
+            conn.execute('UPDATE thumbnails SET last_accessed = ? WHERE digest = ?', (time.time(), row[0]))
+            conn.commit()
+        return data
+
+    def _store(self, url: str, size: Tuple[int, int], data: bytes) -> None:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.{threading.get_ident()}.tmp"
+            with open(partial, 'wb') as f:
+                f.write(data)
+            os.replace(partial, path)
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO thumbnails (digest, size, last_accessed) VALUES (?, ?, ?)',
+                (digest, len(data), time.time())
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO images (url, width, height, digest) VALUES (?, ?, ?, ?)',
+                (url, *size, digest)
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn) -> None:
+        """Delete the least recently used thumbnails until the total size is within max_bytes."""
+        excess = conn.execute('SELECT COALESCE(SUM(size), 0) FROM thumbnails').fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        evicted = []
+        for digest, size in conn.execute('SELECT digest, size FROM thumbnails ORDER BY last_accessed'):
+            if excess <= 0:
+                break
+            evicted.append(digest)
+            excess -= size
+        conn.executemany('DELETE FROM thumbnails WHERE digest = ?', [(digest,) for digest in evicted])
+        conn.executemany('DELETE FROM images WHERE digest = ?', [(digest,) for digest in evicted])
+        for digest in evicted:
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+
+    def get(self, url: Optional[str], size: Tuple[int, int] = IMAGE_THUMBNAIL_SIZE) -> Optional[bytes]:
+        """
+        Return the JPEG thumbnail of the image at `url`, fitting within `size`,
+        downloading and resizing it on first use.
+
+        Returns:
+            Optional[bytes]: The thumbnail, or None if the URL is empty or the image
+                could not be downloaded or decoded
+        """
+        if not url or not isinstance(url, str):
+            return None
+        size = tuple(size)
+        try:
+            data = self._lookup(url, size)
+        except sqlite3.Error as e:
+            logger.warning("Could not read image cache index for %s: %s", url, e)
+            data = None
+        if data is not None:
+            self.hits += 1
+            return data
+        self.misses += 1
+
+        with self._lock:
+            failed_at = self._failures.get((url, size))
+        if failed_at is not None and time.time() - failed_at < self.failure_ttl:
+            return None
+
+        from PIL import Image
+        try:
+            data = self.make_thumbnail(self.fetcher(url), size)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.warning("Could not cache image %s: %s", url, e)
+            with self._lock:
+                self._failures[(url, size)] = time.time()
+            return None
+        try:
+            self._store(url, size, data)
+        except sqlite3.Error as e:
+            logger.warning("Could not index cached image %s: %s", url, e)
+        return data
+
+    def prefetch(self, urls: Iterable[Optional[str]], size: Tuple[int, int] = IMAGE_THUMBNAIL_SIZE,
+                 max_workers: int = IMAGE_FETCH_CONCURRENCY) -> None:
+        """Cache thumbnails for several images, downloading the missing ones concurrently."""
+        urls = list(dict.fromkeys(url for url in urls if url and isinstance(url, str)))
+        if len(urls) <= 1 or max_workers <= 1:
+            for url in urls:
+                self.get(url, size)
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            list(executor.map(lambda url: self.get(url, size), urls))
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            files, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM thumbnails').fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'files': files, 'bytes': size}
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            digests = [row[0] for row in conn.execute('SELECT digest FROM thumbnails')]
+            conn.execute('DELETE FROM images')
+            conn.execute('DELETE FROM thumbnails')
+            conn.commit()
+        for digest in digests:
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._failures.clear()
@@ -0,0 +1,131 @@
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from services.ingredient_names import normalize_ingredient_name
+
+MATCH_COLUMNS = ['used_ingredients', 'missed_ingredients', 'pantry_coverage']
+
+# Number of set bits in every byte value, for popcounts over packed bitsets
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype='uint8')
+
+
+class IngredientMatcher:
+    """
+    Match recipe ingredients against the pantry.
+
+    Ingredients are keyed by Spoonacular ingredient_id where one is known and by
+    normalized name otherwise, so 'Tomatoes' in the pantry matches a recipe's
+    'tomato' (id 11529) either way. Each recipe's ingredient keys and the pantry are
+    encoded as packed bitsets over a shared vocabulary, so used and missing counts
+    for every recipe come from one AND and popcount pass.
+    """
+
+    def __init__(self, pantry_names: Iterable[str], known_ids: Optional[Dict[str, int]] = None):
+        self.known_ids: Dict[str, int] = {}
+        self._name_codes: Dict[str, int] = {}
+        if known_ids:
+            self.learn_ids(known_ids)
+        self.pantry_names: List[str] = sorted({
+            normalize_ingredient_name(name) for name in pantry_names if normalize_ingredient_name(name)
+        })
+
+    @classmethod
+    def from_database(cls, db) -> 'IngredientMatcher':
+        """Build a matcher for the saved pantry, using ingredient ids seen on saved recipes."""
+        return cls(db.get_ingredient_names(pantry_only=True), db.get_ingredient_ids())
+
+    def learn_ids(self, names_to_ids: Dict[str, int]) -> None:
+        """Record name -> ingredient_id pairs; ids of 0 or None are ignored."""
+        for name, ingredient_id in names_to_ids.items():
+            if ingredient_id:
+                self.known_ids.setdefault(normalize_ingredient_name(name), int(ingredient_id))
+
+    def learn_from(self, ingredients_df: pd.DataFrame) -> None:
+        """Record the name -> ingredient_id pairs in a parsed ingredients_df."""
+        if ingredients_df.empty or 'ingredient_id' not in ingredients_df:
+            return
+        known = ingredients_df.loc[ingredients_df['ingredient_id'].fillna(0) > 0, ['name', 'ingredient_id']].drop_duplicates('name')
+        self.learn_ids(dict(zip(known['name'], known['ingredient_id'])))
+
+    def _keys(self, names: pd.Series, ingredient_ids: Optional[pd.Series] = None) -> np.ndarray:
+        """
+        Integer matching key per ingredient: the ingredient_id when known, else a
+        negative code for its normalized name. Names are normalized once per distinct value.
+        """
+        codes, uniques = pd.factorize(names)
+        name_keys = np.empty(len(uniques), dtype='int64')
+        for position, name in enumerate(uniques):
+            normalized = normalize_ingredient_name(name)
+            name_code = self._name_codes.setdefault(normalized, len(self._name_codes))
+            name_keys[position] = self.known_ids.get(normalized) or -1 - name_code
+        keys = name_keys[codes]
+        if ingredient_ids is not None:
+            ids = ingredient_ids.fillna(0).to_numpy(dtype='int64')
+            keys = np.where(ids > 0, ids, keys)
+        return keys
+
+    def coverage(self, ingredients_df: pd.DataFrame, recipe_ids: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """
+        Count pantry hits per recipe.
+
+        Args:
+            ingredients_df: Recipe ingredients with 'recipe_id', 'name' and optionally 'ingredient_id'
+            recipe_ids: Recipes to report on, in order; defaults to those in ingredients_df
+
+        Returns:
+            pd.DataFrame: Indexed by recipe_id with 'used_ingredients', 'missed_ingredients'
+                and 'pantry_coverage' (used / total, 0 for recipes without ingredients)
+        """
+        if recipe_ids is None:
+            recipe_ids = pd.unique(ingredients_df['recipe_id']) if not ingredients_df.empty else []
+        index = pd.Index(list(recipe_ids), name='recipe_id')
+        if ingredients_df.empty or index.empty:
+            return pd.DataFrame({'used_ingredients': 0, 'missed_ingredients': 0, 'pantry_coverage': 0.0}, index=index)
+
+        self.learn_from(ingredients_df)
+        ingredient_ids = ingredients_df['ingredient_id'] if 'ingredient_id' in ingredients_df else None
+        recipe_keys = self._keys(ingredients_df['name'], ingredient_ids)
+        pantry_keys = self._keys(pd.Series(self.pantry_names, dtype='object'))
+
+        codes, vocabulary = pd.factorize(recipe_keys)
+        vocabulary = pd.Index(vocabulary)
+        rows = index.get_indexer(ingredients_df['recipe_id'])
+        keep = rows >= 0
+        rows, codes = rows[keep], codes[keep]
+
+        # Set bit `code` in each recipe's packed bitset; repeated ingredients collapse onto one bit
+        width = (len(vocabulary) + 7) // 8
+        recipe_bits = np.zeros((len(index), width), dtype='uint8')
+        np.bitwise_or.at(recipe_bits, (rows, codes >> 3), (0x80 >> (codes & 7)).astype('uint8'))
+        pantry_mask = np.zeros(len(vocabulary), dtype=bool)
+        positions = vocabulary.get_indexer(pantry_keys)
+        pantry_mask[positions[positions >= 0]] = True
+        pantry_bits = np.packbits(pantry_mask)
+
+        total = _POPCOUNT[recipe_bits].sum(axis=1, dtype='int64')
+        used = _POPCOUNT[recipe_bits & pantry_bits].sum(axis=1, dtype='int64')
+        return pd.DataFrame({
+            'used_ingredients': used,
+            'missed_ingredients': total - used,
+            'pantry_coverage': np.divide(used, total, out=np.zeros(len(index)), where=total > 0)
+        }, index=index)
+
+    def rank(self, recipes_df: pd.DataFrame, ingredients_df: pd.DataFrame, sort: str) -> pd.DataFrame:
+        """
+        Add the coverage columns to recipes_df and re-rank it locally.
+
+        'max-used-ingredients' sorts by used count, 'min-missing-ingredients' by missed
+        count, both breaking ties on coverage; 'time' sorts by prep_time. Any other
+        sort keeps the incoming order.
+        """
+        if recipes_df.empty:
+            return recipes_df
+        matched = self.coverage(ingredients_df, recipes_df.index)
+        ranked = recipes_df.drop(columns=MATCH_COLUMNS, errors='ignore').join(matched)
+        if sort == 'max-used-ingredients':
+            return ranked.sort_values(['used_ingredients', 'pantry_coverage'], ascending=[False, False], kind='stable')
+        if sort == 'min-missing-ingredients':
+            return ranked.sort_values(['missed_ingredients', 'pantry_coverage'], ascending=[True, False], kind='stable')
+        if sort == 'time':
+            return ranked.sort_values('prep_time', kind='stable')
+        return ranked
@@ -0,0 +1,34 @@
+import re
+from functools import lru_cache
+
+# Words the suffix rules below would damage: mass nouns that only look plural and
+# plurals whose singular is not a simple suffix strip
+_IRREGULAR_PLURALS = {
+    'molasses': 'molasses', 'grits': 'grits', 'swiss': 'swiss', 'asparagus': 'asparagus',
+    'cookies': 'cookie', 'brownies': 'brownie', 'smoothies': 'smoothie', 'calories': 'calorie',
+    'leaves': 'leaf', 'loaves': 'loaf', 'halves': 'half', 'knives': 'knife',
+}
+
+
+@lru_cache(maxsize=4096)
+def normalize_ingredient_name(name: str) -> str:
+    """
+    Reduce an ingredient name to a matching key: lowercased, without parentheticals
+    or punctuation, whitespace collapsed and the last word made singular, so
+    'Cherry Tomatoes (canned)' and 'cherry tomato' compare equal.
+    """
+    name = re.sub(r'\(.*?\)', ' ', str(name).lower())
+    words = re.sub(r'[^a-z0-9 ]+', ' ', name).split()
+    if not words:
+        return ''
+    last = words[-1]
+    if last in _IRREGULAR_PLURALS:
+        last = _IRREGULAR_PLURALS[last]
+    elif last.endswith('ies') and len(last) > 4:
+        last = last[:-3] + 'y'
+    elif last.endswith(('oes', 'ches', 'shes', 'sses', 'xes')):
+        last = last[:-2]
+    elif last.endswith('s') and not last.endswith(('ss', 'us', 'is')) and len(last) > 3:
+        last = last[:-1]
+    words[-1] = last
+    return ' '.join(words)
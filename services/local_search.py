@@ -0,0 +1,93 @@
+import re
+from typing import List, Optional, Tuple
+import pandas as pd
+
+RECIPE_COLUMNS = ['name', 'servings', 'prep_time', 'total_cost', 'source_url', 'image_url']
+INGREDIENT_COLUMNS = ['recipe_id', 'ingredient_id', 'name', 'amount', 'unit', 'original_string', 'aisle']
+NUTRITION_COLUMNS = ['calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar', 'sodium', 'cholesterol']
+
+
+def load_recipe_frames(db, recipe_ids: Optional[List[int]] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Load saved recipes as (recipes_df, ingredients_df, nutrition_df), shaped like
+    SpoonacularAPI.parse_recipe_data output. Loads every saved recipe when
+    recipe_ids is None; otherwise frames follow the order of recipe_ids.
+    """
+    recipes_df = pd.DataFrame(db.get_recipes(recipe_ids), columns=['id', 'recipe_name', 'source_url', 'total_cost', 'prep_time', 'image_url', 'servings'])
+    recipes_df = recipes_df.rename(columns={'id': 'recipe_id', 'recipe_name': 'name'}).set_index('recipe_id')[RECIPE_COLUMNS]
+    ingredients_df = pd.DataFrame(
+        db.get_ingredients(pantry_only=False, recipe_ids=recipe_ids),
+        columns=INGREDIENT_COLUMNS
+    )
+    nutrition_df = pd.DataFrame(db.get_nutrition(recipe_ids), columns=['recipe_id'] + NUTRITION_COLUMNS).set_index('recipe_id')
+    if recipe_ids is not None:
+        recipes_df = recipes_df.reindex([recipe_id for recipe_id in recipe_ids if recipe_id in recipes_df.index])
+        nutrition_df = nutrition_df.reindex([recipe_id for recipe_id in recipe_ids if recipe_id in nutrition_df.index])
+    return recipes_df, ingredients_df, nutrition_df
+
+
+def fts_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 MATCH expression: any word, each as a prefix."""
+    terms = re.findall(r'\w+', text.lower())
+    return ' OR '.join(f'"{term}"*' for term in terms) if terms else None
+
+
+class LocalRecipeSearch:
+    """
+    Offline recipe search over recipes saved in meal_prep.db.
+
+    Answers the same inputs as SpoonacularAPI.search_recipes and returns the same three
+    DataFrames, ranked by FTS5 BM25 relevance plus pantry overlap, so planning keeps
+    working without network access or API quota.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def search_recipes(self, query: str, ingredients: str, nutrition_goals, max_ready_time: int, sort: str,
+                       number: int = 5, **_) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Search saved recipes.
+
+        Args:
+            query: Free text matched against recipe and ingredient names
+            ingredients: Comma-separated pantry ingredient names
+            nutrition_goals: (min, max) per nutrient, applied to each recipe
+            max_ready_time: Maximum prep time in minutes
+            sort: 'max-used-ingredients', 'min-missing-ingredients' or 'time'; any other
+                value ranks by relevance alone
+            number: Maximum number of recipes to return
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]: recipes_df (with extra
+                'relevance', 'used_ingredients' and 'missed_ingredients' columns),
+                ingredients_df and nutrition_df
+        """
+        pantry = sorted({name.strip().lower() for name in ingredients.split(',') if name.strip()})
+        hits = pd.DataFrame(
+            self.db.search_recipes(fts_query(query), pantry, max_ready_time, dict(nutrition_goals)),
+            columns=['recipe_id', 'bm25', 'prep_time', 'used_ingredients', 'total_ingredients']
+        )
+        if hits.empty:
+            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+        # BM25 is lower-is-better; flip and scale it to [0, 1] so pantry coverage weighs in equally
+        relevance = -hits['bm25']
+        hits['relevance'] = relevance / relevance.max() if relevance.max() > 0 else 0.0
+        coverage = hits['used_ingredients'] / hits['total_ingredients'].where(hits['total_ingredients'] > 0)
+        hits['score'] = hits['relevance'] + coverage.fillna(0)
+        hits['missed_ingredients'] = hits['total_ingredients'] - hits['used_ingredients']
+
+        if sort == 'max-used-ingredients':
+            hits = hits.sort_values(['used_ingredients', 'score'], ascending=[False, False], kind='stable')
+        elif sort == 'min-missing-ingredients':
+            hits = hits.sort_values(['missed_ingredients', 'score'], ascending=[True, False], kind='stable')
+        elif sort == 'time':
+            hits = hits.sort_values(['prep_time', 'score'], ascending=[True, False], kind='stable')
+        else:
+            hits = hits.sort_values('score', ascending=False, kind='stable')
+
+        hits = hits.head(number).set_index('recipe_id')
+        recipes_df, ingredients_df, nutrition_df = load_recipe_frames(self.db, hits.index.tolist())
+        recipes_df = recipes_df.join(hits[['relevance', 'used_ingredients', 'missed_ingredients']])
+        return recipes_df, ingredients_df, nutrition_df
@@ -0,0 +1,158 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from models.meal_plan import MealPlan, MEAL_TYPES
+from services.ingredient_matcher import IngredientMatcher
+from utils.defaults import EXPIRY_WEIGHT
+
+# Weight of one unit of relative nutrient-bound violation against one unit of cost
+BOUND_PENALTY = 1000.0
+
+
+@dataclass
+class OptimizationResult:
+    meal_plan: MealPlan
+    objective: float
+    total_cost: float
+    missing_ingredients: int
+    days_off_target: int
+    solve_time: float
+    iterations: int
+    pool_size: int
+    daily_totals: pd.DataFrame = field(repr=False)
+
+
+class MealPlanOptimizer:
+    """
+    Fill a MealPlan from a pool of candidate recipes.
+
+    Each day gets one recipe per meal slot. The objective is
+    cost_weight * total_cost + missing_weight * missing pantry ingredients, minus
+    expiry_weight * expiry score when expiry_scores are given, plus a large
+    penalty for daily nutrient totals outside the goal ranges. Each day is seeded
+    greedily and then improved by local search that re-picks one slot at a time;
+    every step scores the whole pool at once with NumPy.
+    """
+
+    def __init__(self, recipes_df: pd.DataFrame, nutrition_df: pd.DataFrame, ingredients_df: pd.DataFrame,
+                 pantry_names: Iterable[str], cost_weight: float = 1.0, missing_weight: float = 1.0,
+                 expiry_scores: Optional[pd.Series] = None, expiry_weight: float = EXPIRY_WEIGHT):
+        self.recipe_ids = recipes_df.index.to_numpy(dtype='int64')
+        self.cost = recipes_df['total_cost'].to_numpy(dtype='float64')
+        coverage = IngredientMatcher(pantry_names).coverage(ingredients_df, self.recipe_ids)
+        self.missing = coverage['missed_ingredients'].to_numpy(dtype='float64')
+        self.nutrition = nutrition_df.reindex(self.recipe_ids)
+        self.base_score = cost_weight * self.cost + missing_weight * self.missing
+        if expiry_scores is not None:
+            # Prefer recipes that use up stock about to expire (see ExpiryIndex.score)
+            expiry = expiry_scores.reindex(self.recipe_ids, fill_value=0.0).to_numpy(dtype='float64')
+            self.base_score = self.base_score - expiry_weight * expiry
+
+    @staticmethod
+    def _penalty(totals: np.ndarray, lower: np.ndarray, upper: np.ndarray, scale: np.ndarray) -> np.ndarray:
+        """Relative bound violation summed over nutrients; totals has nutrients on the last axis."""
+        below = np.maximum(lower - totals, 0) / scale
+        above = np.maximum(totals - upper, 0) / scale
+        return BOUND_PENALTY * (below + above).sum(axis=-1)
+
+    def solve(self, nutrition_goals: Dict[str, Tuple[float, float]], num_days: int, start_date: str,
+              slots: List[str] = MEAL_TYPES, max_repeats: Optional[int] = None,
+              max_iterations: int = 50) -> OptimizationResult:
+        """
+        Build a plan of `num_days` days with one recipe in each of `slots` per day.
+
+        Args:
+            nutrition_goals: Daily (min, max) per nutrient, as from nutrition_goal_setting_widget
+            num_days: Number of days to plan
+            start_date: First day of the plan, 'YYYY-MM-DD'
+            slots: Meal types to fill each day
+            max_repeats: Maximum number of times a recipe may appear in the plan, or None
+            max_iterations: Local search passes per day
+
+        Returns:
+            OptimizationResult: The plan, its objective breakdown and the solve time
+        """
+        started = time.perf_counter()
+        for slot in slots:
+            if slot not in MEAL_TYPES:
+                raise ValueError(f"Unknown meal slot {slot!r}; expected one of {', '.join(MEAL_TYPES)}")
+        if len(self.recipe_ids) < len(slots):
+            raise ValueError(f"Need at least {len(slots)} candidate recipes, got {len(self.recipe_ids)}")
+
+        nutrients = [nutrient for nutrient in nutrition_goals if nutrient in self.nutrition.columns]
+        values = self.nutrition[nutrients].fillna(0).to_numpy(dtype='float64')
+        lower = np.array([nutrition_goals[nutrient][0] for nutrient in nutrients], dtype='float64')
+        upper = np.array([nutrition_goals[nutrient][1] for nutrient in nutrients], dtype='float64')
+        scale = np.maximum(upper - lower, 1.0)
+        mean_values = values.mean(axis=0)
+
+        uses = np.zeros(len(self.recipe_ids), dtype='int64')
+        days, iterations = [], 0
+        for _ in range(num_days):
+            available = np.ones(len(self.recipe_ids), dtype=bool) if max_repeats is None else uses < max_repeats
+            if available.sum() < len(slots):
+                raise ValueError("Not enough distinct recipes to satisfy max_repeats")
+
+            # Greedy seed: fill slots in turn, assuming the remaining slots get average recipes
+            picks: List[int] = []
+            totals = np.zeros(len(nutrients))
+            for position in range(len(slots)):
+                remaining = len(slots) - position - 1
+                projected = totals + values + remaining * mean_values
+                scores = self.base_score + self._penalty(projected, lower, upper, scale)
+                scores[~available] = np.inf
+                scores[picks] = np.inf
+                pick = int(np.argmin(scores))
+                picks.append(pick)
+                totals += values[pick]
+
+            # Local search: re-pick one slot at a time against the rest of the day
+            for _ in range(max_iterations):
+                iterations += 1
+                improved = False
+                for position in range(len(slots)):
+                    others = picks[:position] + picks[position + 1:]
+                    rest = values[others].sum(axis=0)
+                    scores = self.base_score + self._penalty(rest + values, lower, upper, scale)
+                    scores[~available] = np.inf
+                    scores[others] = np.inf
+                    best = int(np.argmin(scores))
+                    if scores[best] < scores[picks[position]] - 1e-9:
+                        picks[position] = best
+                        improved = True
+                if not improved:
+                    break
+
+            uses[picks] += 1
+            days.append(picks)
+
+        day_picks = np.array(days, dtype='int64').reshape(num_days, len(slots))
+        daily_totals = values[day_picks].sum(axis=1)
+        penalties = self._penalty(daily_totals, lower, upper, scale)
+        objective = float(self.base_score[day_picks].sum() + penalties.sum())
+
+        meals = {meal_type: [[] for _ in range(num_days)] for meal_type in MEAL_TYPES}
+        for position, meal_type in enumerate(slots):
+            for day in range(num_days):
+                meals[meal_type][day] = [int(self.recipe_ids[day_picks[day, position]])]
+
+        dates = pd.date_range(start_date, periods=num_days).strftime('%Y-%m-%d')
+        return OptimizationResult(
+            meal_plan=MealPlan(
+                start_date=start_date,
+                num_days=num_days,
+                breakfast=meals['breakfast'],
+                lunch=meals['lunch'],
+                dinner=meals['dinner']
+            ),
+            objective=objective,
+            total_cost=float(self.cost[day_picks].sum()),
+            missing_ingredients=int(self.missing[day_picks].sum()),
+            days_off_target=int((penalties > 0).sum()),
+            solve_time=time.perf_counter() - started,
+            iterations=iterations,
+            pool_size=len(self.recipe_ids),
+            daily_totals=pd.DataFrame(daily_totals, index=pd.Index(dates, name='date'), columns=nutrients)
+        )
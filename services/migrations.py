@@ -0,0 +1,131 @@
+"""
+Ordered schema migrations for meal_prep.db.
+
+The tables created by Database.init_db are schema version 0. MIGRATIONS[n] upgrades
+the database from version n to n + 1, and the applied version is tracked in
+PRAGMA user_version. Append new migrations to the end of the list; never edit or
+reorder ones that have shipped.
+"""
+from typing import List
+
+def _backfill_meal_plan_entries(meal_type: str) -> List[str]:
+    """
+    Copy one meal type's JSON lists from meal_plans into meal_plan_entries. Current plans
+    hold one list of recipe ids per day; plans saved before that hold a flat list whose
+    i-th recipe is for day i (wrapping around after num_days).
+    """
+    return [
+        f"""INSERT INTO meal_plan_entries (plan_id, date, meal_type, position, recipe_id)
+            SELECT plan.id, date(plan.start_date, '+' || day.key || ' days'), '{meal_type}', meal.key, meal.value
+            FROM meal_plans AS plan, json_each(plan.{meal_type}) AS day, json_each(day.value) AS meal
+            WHERE day.type = 'array'""",
+        f"""INSERT INTO meal_plan_entries (plan_id, date, meal_type, position, recipe_id)
+            SELECT plan.id, date(plan.start_date, '+' || (day.key % max(plan.num_days, 1)) || ' days'), '{meal_type}',
+                   day.key / max(plan.num_days, 1), day.value
+            FROM meal_plans AS plan, json_each(plan.{meal_type}) AS day
+            WHERE day.type = 'integer'""",
+    ]
+
+
+MIGRATIONS: List[List[str]] = [
+    # 1: Indexes for ingredient lookups by recipe, by name and by expiry, and for plan history
+    [
+        'CREATE INDEX IF NOT EXISTS idx_ingredients_recipe_id ON ingredients (recipe_id)',
+        'CREATE INDEX IF NOT EXISTS idx_ingredients_lower_name ON ingredients (lower(name))',
+        'CREATE INDEX IF NOT EXISTS idx_ingredients_expiry_date ON ingredients (expiry_date)',
+        'CREATE INDEX IF NOT EXISTS idx_meal_plans_start_date ON meal_plans (start_date)',
+    ],
+    # 2: Store sugar alongside the other nutrients, so saved recipes can be filtered on every goal
+    [
+        'ALTER TABLE nutrition ADD COLUMN sugar REAL',
+    ],
+    # 3: Full-text indexes over recipe names and ingredient names/original strings, kept in sync by triggers
+    [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(
+            recipe_name, content='recipes', content_rowid='recipe_id', tokenize='porter unicode61'
+        )""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS ingredients_fts USING fts5(
+            name, original_string, content='ingredients', content_rowid='id', tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS recipes_fts_insert AFTER INSERT ON recipes BEGIN
+            INSERT INTO recipes_fts (rowid, recipe_name) VALUES (new.recipe_id, new.recipe_name);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS recipes_fts_delete AFTER DELETE ON recipes BEGIN
+            INSERT INTO recipes_fts (recipes_fts, rowid, recipe_name) VALUES ('delete', old.recipe_id, old.recipe_name);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS recipes_fts_update AFTER UPDATE ON recipes BEGIN
+            INSERT INTO recipes_fts (recipes_fts, rowid, recipe_name) VALUES ('delete', old.recipe_id, old.recipe_name);
+            INSERT INTO recipes_fts (rowid, recipe_name) VALUES (new.recipe_id, new.recipe_name);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS ingredients_fts_insert AFTER INSERT ON ingredients BEGIN
+            INSERT INTO ingredients_fts (rowid, name, original_string) VALUES (new.id, new.name, new.original_string);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS ingredients_fts_delete AFTER DELETE ON ingredients BEGIN
+            INSERT INTO ingredients_fts (ingredients_fts, rowid, name, original_string) VALUES ('delete', old.id, old.name, old.original_string);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS ingredients_fts_update AFTER UPDATE ON ingredients BEGIN
+            INSERT INTO ingredients_fts (ingredients_fts, rowid, name, original_string) VALUES ('delete', old.id, old.name, old.original_string);
+            INSERT INTO ingredients_fts (rowid, name, original_string) VALUES (new.id, new.name, new.original_string);
+        END""",
+        "INSERT INTO recipes_fts (recipes_fts) VALUES ('rebuild')",
+        "INSERT INTO ingredients_fts (ingredients_fts) VALUES ('rebuild')",
+    ],
+    # 4: One row per planned meal, so plan history can be queried by recipe or date without decoding JSON
+    [
+        """CREATE TABLE IF NOT EXISTS meal_plan_entries (
+            plan_id INTEGER NOT NULL REFERENCES meal_plans (id) ON DELETE CASCADE,
+            date TEXT NOT NULL,
+            meal_type TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            recipe_id INTEGER NOT NULL,
+            PRIMARY KEY (plan_id, date, meal_type, position)
+        ) WITHOUT ROWID""",
+        'CREATE INDEX IF NOT EXISTS idx_meal_plan_entries_date ON meal_plan_entries (date, meal_type)',
+        'CREATE INDEX IF NOT EXISTS idx_meal_plan_entries_recipe_id ON meal_plan_entries (recipe_id, plan_id)',
+        *(statement for meal_type in ('breakfast', 'lunch', 'dinner') for statement in _backfill_meal_plan_entries(meal_type)),
+    ],
+    # 5: Per-plan and per-day nutrition and cost totals, so plan history renders without re-aggregating
+    [
+        """CREATE TABLE IF NOT EXISTS meal_plan_summaries (
+            plan_id INTEGER PRIMARY KEY REFERENCES meal_plans (id) ON DELETE CASCADE,
+            start_date TEXT NOT NULL,
+            num_days INTEGER NOT NULL,
+            meals INTEGER NOT NULL,
+            calories REAL NOT NULL,
+            protein REAL NOT NULL,
+            carbs REAL NOT NULL,
+            fat REAL NOT NULL,
+            cost REAL NOT NULL
+        )""",
+        'CREATE INDEX IF NOT EXISTS idx_meal_plan_summaries_start_date ON meal_plan_summaries (start_date, plan_id)',
+        """CREATE TABLE IF NOT EXISTS meal_plan_day_summaries (
+            plan_id INTEGER NOT NULL REFERENCES meal_plans (id) ON DELETE CASCADE,
+            date TEXT NOT NULL,
+            meals INTEGER NOT NULL,
+            calories REAL NOT NULL,
+            protein REAL NOT NULL,
+            carbs REAL NOT NULL,
+            fat REAL NOT NULL,
+            cost REAL NOT NULL,
+            PRIMARY KEY (plan_id, date)
+        ) WITHOUT ROWID""",
+        'CREATE INDEX IF NOT EXISTS idx_meal_plan_day_summaries_date ON meal_plan_day_summaries (date)',
+        """INSERT INTO meal_plan_day_summaries (plan_id, date, meals, calories, protein, carbs, fat, cost)
+            SELECT entry.plan_id, entry.date, COUNT(*), TOTAL(nutrition.calories), TOTAL(nutrition.protein),
+                   TOTAL(nutrition.carbs), TOTAL(nutrition.fat), TOTAL(recipe.total_cost)
+            FROM meal_plan_entries AS entry
+            LEFT JOIN nutrition ON nutrition.recipe_id = entry.recipe_id
+            LEFT JOIN recipes AS recipe ON recipe.recipe_id = entry.recipe_id
+            GROUP BY entry.plan_id, entry.date""",
+        """INSERT INTO meal_plan_summaries (plan_id, start_date, num_days, meals, calories, protein, carbs, fat, cost)
+            SELECT plan.id, plan.start_date, plan.num_days, COALESCE(SUM(day.meals), 0), TOTAL(day.calories),
+                   TOTAL(day.protein), TOTAL(day.carbs), TOTAL(day.fat), TOTAL(day.cost)
+            FROM meal_plans AS plan
+            LEFT JOIN meal_plan_day_summaries AS day ON day.plan_id = plan.id
+            GROUP BY plan.id""",
+    ],
+    # 6: Recipes saved before migration 2 have no sugar value; count it as 0 like the API does for a missing nutrient
+    [
+        'UPDATE nutrition SET sugar = 0 WHERE sugar IS NULL',
+    ],
+]
@@ -0,0 +1,111 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+NUTRIENTS = ['calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar', 'sodium', 'cholesterol']
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+
+
+class NutritionAggregator:
+    """
+    Nutrition totals for a meal plan, per day, per meal type and for the whole plan.
+
+    Totals are kept in a (day x meal type x nutrient) array, and each added or removed
+    entry updates a single cell, so the Meal Planning page can show live totals
+    without recomputing from scratch. Days are only reported while they have entries;
+    once the last one is removed the day's row is zeroed and reused. Implements the
+    MealPlanBuffer listener interface (entry_added / entry_removed / cleared).
+    """
+
+    def __init__(self):
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._dates: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._totals = np.zeros((0, len(MEAL_TYPES), len(NUTRIENTS)))
+
+    def register_nutrition(self, nutrition_df: pd.DataFrame) -> None:
+        """Remember per-recipe nutrient values (nutrition_df indexed by recipe_id)."""
+        if nutrition_df.empty:
+            return
+        values = nutrition_df.reindex(columns=NUTRIENTS).fillna(0).to_numpy(dtype='float64')
+        self._vectors.update(zip(nutrition_df.index.astype('int64').tolist(), values))
+
+    def _vector(self, recipe_id: int) -> np.ndarray:
+        vector = self._vectors.get(int(recipe_id))
+        return vector if vector is not None else np.zeros(len(NUTRIENTS))
+
+    def _day_index(self, date: str) -> int:
+        index = self._dates.get(date)
+        if index is None:
+            if self._free:
+                index = self._dates[date] = self._free.pop()
+                return index
+            index = self._dates[date] = len(self._dates)
+            if index >= len(self._totals):
+                grown = np.zeros((max(8, 2 * len(self._totals)), len(MEAL_TYPES), len(NUTRIENTS)))
+                grown[:len(self._totals)] = self._totals
+                self._totals = grown
+        return index
+
+    def entry_added(self, entry: Dict) -> None:
+        day = self._day_index(entry['date'])
+        self._counts[entry['date']] = self._counts.get(entry['date'], 0) + 1
+        self._totals[day, MEAL_TYPES.index(entry['meal_type'])] += self._vector(entry['recipe_id'])
+
+    def entry_removed(self, entry: Dict) -> None:
+        day = self._dates.get(entry['date'])
+        if day is None:
+            return
+        self._counts[entry['date']] -= 1
+        if self._counts[entry['date']] > 0:
+            self._totals[day, MEAL_TYPES.index(entry['meal_type'])] -= self._vector(entry['recipe_id'])
+            return
+        # Last meal of the day: drop the date and zero its row (clearing float noise) for reuse
+        del self._counts[entry['date']], self._dates[entry['date']]
+        self._totals[day] = 0
+        self._free.append(day)
+
+    def cleared(self) -> None:
+        self._dates = {}
+        self._counts = {}
+        self._free = []
+        self._totals = np.zeros((0, len(MEAL_TYPES), len(NUTRIENTS)))
+
+    def _day_meal_totals(self) -> Tuple[list, np.ndarray]:
+        dates = sorted(self._dates)
+        return dates, self._totals[[self._dates[date] for date in dates]]
+
+    def per_day(self) -> pd.DataFrame:
+        """Totals per date (rows) and nutrient (columns), in date order."""
+        dates, totals = self._day_meal_totals()
+        return pd.DataFrame(totals.sum(axis=1), index=pd.Index(dates, name='date'), columns=NUTRIENTS)
+
+    def per_meal_type(self) -> pd.DataFrame:
+        """Totals per meal type (rows) and nutrient (columns), summed over all days."""
+        return pd.DataFrame(self._totals.sum(axis=0), index=pd.Index(MEAL_TYPES, name='meal_type'), columns=NUTRIENTS)
+
+    def plan_total(self) -> pd.Series:
+        """Totals for the whole plan, per nutrient."""
+        return pd.Series(self._totals.sum(axis=(0, 1)), index=NUTRIENTS)
+
+    def goal_violations(self, nutrition_goals: Dict[str, Tuple[float, float]],
+                        per_day: Optional[pd.DataFrame] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Compare daily totals with (min, max) goals as returned by nutrition_goal_setting_widget.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: Boolean (below_min, above_max) masks with
+                one row per date and one column per goal nutrient
+        """
+        per_day = self.per_day() if per_day is None else per_day
+        nutrients = [nutrient for nutrient in nutrition_goals if nutrient in NUTRIENTS]
+        values = per_day[nutrients].to_numpy()
+        minimums = np.array([nutrition_goals[nutrient][0] for nutrient in nutrients], dtype='float64')
+        maximums = np.array([nutrition_goals[nutrient][1] for nutrient in nutrients], dtype='float64')
+        # Round away float noise left behind by incremental add/remove
+        values = np.round(values, 6)
+        return (
+            pd.DataFrame(values < minimums, index=per_day.index, columns=nutrients),
+            pd.DataFrame(values > maximums, index=per_day.index, columns=nutrients)
+        )
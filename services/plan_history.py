@@ -0,0 +1,77 @@
+import calendar
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from utils.defaults import PLAN_HISTORY_PAGE_SIZE
+
+# Keyset cursor: (start_date, plan_id) of the last plan on the previous page
+Cursor = Tuple[str, int]
+
+
+class PlanHistory:
+    """
+    Saved meal plans for the User Dashboard, read from the per-plan and per-day
+    summary tables filled when a plan is saved, so nothing is re-aggregated from
+    recipes and nutrition on each visit.
+
+    `db` is a Database or a CachedReads over one; with CachedReads, pages and
+    months already shown are served from memory until another plan is saved.
+    """
+
+    def __init__(self, db, page_size: int = PLAN_HISTORY_PAGE_SIZE):
+        self.db = db
+        self.page_size = page_size
+
+    def page(self, cursor: Optional[Cursor] = None) -> Tuple[List[Dict], Optional[Cursor]]:
+        """
+        Return one page of plan summaries, newest first.
+
+        Args:
+            cursor: None for the first page, otherwise the cursor returned with the previous page
+
+        Returns:
+            Tuple[List[Dict], Optional[Cursor]]: The plans, and the cursor for the next
+                page (None when this is the last one)
+        """
+        # One extra row tells whether another page follows without a COUNT(*)
+        rows = self.db.get_meal_plan_summaries(before=cursor, limit=self.page_size + 1)
+        plans = rows[:self.page_size]
+        if len(rows) <= self.page_size:
+            return plans, None
+        return plans, (plans[-1]['start_date'], plans[-1]['plan_id'])
+
+    def pages(self, count: int) -> Tuple[List[Dict], bool]:
+        """
+        Return the first `count` pages of plans joined together, and whether more remain.
+        """
+        plans: List[Dict] = []
+        cursor = None
+        for _ in range(count):
+            page, cursor = self.page(cursor)
+            plans.extend(page)
+            if cursor is None:
+                return plans, False
+        return plans, True
+
+    def plan_days(self, plan_id: int) -> List[Dict]:
+        """Per-day totals for one plan, in date order."""
+        return self.db.get_meal_plan_day_summaries(plan_id=plan_id)
+
+    def month(self, year: int, month: int) -> Dict[date, Dict]:
+        """
+        Totals per calendar day of a month, summed over every plan covering that day.
+
+        Returns:
+            Dict[date, Dict]: meals, calories, protein, carbs, fat, cost and plan_ids
+                for each day of the month that has planned meals
+        """
+        first = date(year, month, 1)
+        last = first + timedelta(days=calendar.monthrange(year, month)[1] - 1)
+        days: Dict[date, Dict] = {}
+        for row in self.db.get_meal_plan_day_summaries(start_date=first, end_date=last):
+            day = days.setdefault(date.fromisoformat(row['date']), {
+                'meals': 0, 'calories': 0.0, 'protein': 0.0, 'carbs': 0.0, 'fat': 0.0, 'cost': 0.0, 'plan_ids': []
+            })
+            for column in ('meals', 'calories', 'protein', 'carbs', 'fat', 'cost'):
+                day[column] += row[column]
+            day['plan_ids'].append(row['plan_id'])
+        return days
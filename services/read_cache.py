@@ -0,0 +1,129 @@
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+from utils.defaults import READ_CACHE_MAX_ENTRIES
+
+# Read method -> tables whose writes invalidate its results
+READ_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    'get_ingredients': ('ingredients',),
+    'get_ingredient_names': ('ingredients',),
+    'get_ingredient_ids': ('ingredients',),
+    'get_ingredient_totals': ('ingredients',),
+    'get_recipes': ('recipes',),
+    'get_nutrition': ('nutrition',),
+    'get_meal_plans': ('meal_plans',),
+    'get_meal_plan': ('meal_plans', 'meal_plan_entries'),
+    'get_meal_plan_entries': ('meal_plan_entries',),
+    'get_meal_plan_ids': ('meal_plan_entries',),
+    'get_meal_plan_summaries': ('meal_plan_summaries',),
+    'get_meal_plan_day_summaries': ('meal_plan_summaries',),
+}
+
+
+def _freeze(value):
+    """Make list arguments (e.g. recipe_ids) usable in a cache key."""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(value)
+    return value
+
+
+class CachedReads:
+    """
+    Read-only view of a Database whose results survive Streamlit reruns.
+
+    Exposes the same read methods as Database, so it can be passed anywhere a
+    Database is only read from (Ingredient.load_inventory, IngredientMatcher.from_database,
+    load_recipe_frames, ...). Each result is stored with the versions of the tables it
+    reads (Database.table_versions) and served until a write to one of them commits,
+    so widget interactions that don't write skip SQL entirely.
+
+    Results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, db, max_entries: int = READ_CACHE_MAX_ENTRIES):
+        self.db = db
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _read(self, method: str, *args, **kwargs):
+        tables = READ_DEPENDENCIES[method]
+        key = (method, tuple(_freeze(arg) for arg in args), tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+        # Take the versions before reading, so a write that commits mid-read leaves the entry stale
+        versions = self.db.table_versions(*tables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = getattr(self.db, method)(*args, **kwargs)
+        with self._lock:
+            self._entries[key] = (versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_ingredients(self, *args, **kwargs) -> List[Dict]:
+        return self._read('get_ingredients', *args, **kwargs)
+
+    def iter_ingredients(self, pantry_only: Optional[bool] = None, name_prefix: Optional[str] = None,
+                         expiring_before=None, recipe_ids: Optional[List[int]] = None, batch_size: int = 500) -> Iterator[Dict]:
+        return iter(self.get_ingredients(pantry_only=pantry_only, name_prefix=name_prefix,
+                                         expiring_before=expiring_before, recipe_ids=recipe_ids))
+
+    def get_ingredient_names(self, pantry_only: Optional[bool] = None) -> List[str]:
+        return self._read('get_ingredient_names', pantry_only=pantry_only)
+
+    def get_ingredient_ids(self) -> Dict[str, int]:
+        return self._read('get_ingredient_ids')
+
+    def get_ingredient_totals(self, pantry_only: Optional[bool] = True) -> List[Dict]:
+        return self._read('get_ingredient_totals', pantry_only=pantry_only)
+
+    def get_recipes(self, recipe_ids: Optional[List[int]] = None) -> List[Dict]:
+        return self._read('get_recipes', recipe_ids)
+
+    def get_nutrition(self, recipe_ids: Optional[List[int]] = None) -> List[Dict]:
+        return self._read('get_nutrition', recipe_ids)
+
+    def get_meal_plans(self) -> List[Dict]:
+        return self._read('get_meal_plans')
+
+    def get_meal_plan(self, plan_id: int) -> Optional[Dict]:
+        return self._read('get_meal_plan', plan_id)
+
+    def get_meal_plan_entries(self, start_date=None, end_date=None, recipe_id: Optional[int] = None) -> List[Dict]:
+        return self._read('get_meal_plan_entries', start_date=start_date, end_date=end_date, recipe_id=recipe_id)
+
+    def get_meal_plan_ids(self, recipe_id: int) -> List[int]:
+        return self._read('get_meal_plan_ids', recipe_id)
+
+    def get_meal_plan_summaries(self, before: Optional[Tuple[str, int]] = None, limit: int = 20) -> List[Dict]:
+        return self._read('get_meal_plan_summaries', before=before, limit=limit)
+
+    def get_meal_plan_day_summaries(self, plan_id: Optional[int] = None, start_date=None, end_date=None) -> List[Dict]:
+        return self._read('get_meal_plan_day_summaries', plan_id=plan_id, start_date=start_date, end_date=end_date)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_instances: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_instances_lock = threading.Lock()
+
+
+def cached_reads(db) -> CachedReads:
+    """Return the CachedReads shared by everything that reads from `db`."""
+    with _instances_lock:
+        reads = _instances.get(db)
+        if reads is None:
+            reads = _instances[db] = CachedReads(db)
+        return reads
@@ -0,0 +1,185 @@
+import csv
+import io
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+import pandas as pd
+from services.ingredient_names import normalize_ingredient_name
+from services.units import canonicalize
+
+SHOPPING_LIST_COLUMNS = ['aisle', 'name', 'unit', 'required', 'in_stock', 'to_buy']
+DEFAULT_AISLE = 'Other'
+
+# (normalized ingredient name, canonical unit)
+ItemKey = Tuple[str, str]
+
+
+class ShoppingList:
+    """
+    What to buy for a meal plan: required ingredients summed over every planned meal,
+    minus what the pantry already holds, grouped by aisle.
+
+    Quantities are converted to canonical units and names normalized, so '2 cups
+    flour' and '500 g Flour' land on the same line. Required totals are kept per
+    item and updated as entries are added or removed, so the Meal Planning page
+    never rebuilds them from the whole plan. Implements the MealPlanBuffer listener
+    interface (entry_added / entry_removed / cleared).
+    """
+
+    def __init__(self):
+        self._lines: Dict[int, List[Tuple[ItemKey, float]]] = {}
+        self._items: Dict[ItemKey, Tuple[str, str]] = {}
+        self._counts: Dict[int, int] = defaultdict(int)
+        self._required: Dict[ItemKey, float] = defaultdict(float)
+        self._stock: Dict[ItemKey, float] = {}
+        self._stock_rows: Optional[List[Dict]] = None
+        self._frame: Optional[pd.DataFrame] = None
+
+    @staticmethod
+    def _canonical_items(df: pd.DataFrame) -> pd.DataFrame:
+        """Canonicalize amounts and units and add the normalized 'item' name."""
+        converted = canonicalize(df[['name', 'amount', 'unit']].assign(amount=df['amount'].fillna(0)))
+        codes, uniques = pd.factorize(converted['name'].astype(str))
+        converted['item'] = pd.Index([normalize_ingredient_name(name) for name in uniques])[codes]
+        return converted
+
+    def register_ingredients(self, ingredients_df: pd.DataFrame) -> None:
+        """
+        Remember per-recipe ingredient requirements (ingredients_df as parsed from a search).
+
+        Recipes already in the plan are re-counted with the new requirements.
+        """
+        if ingredients_df.empty:
+            return
+        items = self._canonical_items(ingredients_df)
+        items['recipe_id'] = ingredients_df['recipe_id'].to_numpy(dtype='int64')
+        aisles = ingredients_df['aisle'] if 'aisle' in ingredients_df else pd.Series(None, index=ingredients_df.index)
+        items['aisle'] = aisles.fillna(DEFAULT_AISLE).to_numpy(dtype=object)
+        grouped = items.groupby(['recipe_id', 'item', 'unit'], sort=False).agg(
+            amount=('amount', 'sum'), name=('name', 'first'), aisle=('aisle', 'first')
+        )
+
+        lines: Dict[int, List[Tuple[ItemKey, float]]] = defaultdict(list)
+        for (recipe_id, item, unit), amount, name, aisle in zip(grouped.index, grouped['amount'], grouped['name'], grouped['aisle']):
+            self._items.setdefault((item, unit), (str(name).lower(), aisle))
+            lines[int(recipe_id)].append(((item, unit), float(amount)))
+        for recipe_id, recipe_lines in lines.items():
+            count = self._counts.get(recipe_id, 0)
+            if count:
+                self._apply(recipe_id, -count)
+            self._lines[recipe_id] = recipe_lines
+            if count:
+                self._apply(recipe_id, count)
+
+    def refresh_pantry(self, db) -> None:
+        """
+        Reload pantry stock from the database's per-ingredient totals. With a
+        CachedReads `db`, unchanged totals come back as the same list and are skipped.
+        """
+        rows = db.get_ingredient_totals(pantry_only=True)
+        if rows is self._stock_rows:
+            return
+        self._stock_rows = rows
+        totals = pd.DataFrame(rows, columns=['name', 'unit', 'amount'])
+        stock: Dict[ItemKey, float] = defaultdict(float)
+        if not totals.empty:
+            items = self._canonical_items(totals)
+            for item, unit, amount in zip(items['item'], items['unit'], items['amount']):
+                stock[(item, unit)] += amount
+        if stock != self._stock:
+            self._stock = dict(stock)
+            self._frame = None
+
+    def _apply(self, recipe_id: int, times: int) -> None:
+        for key, amount in self._lines.get(recipe_id, ()):
+            total = self._required[key] + times * amount
+            if abs(total) < 1e-9:
+                del self._required[key]
+            else:
+                self._required[key] = total
+        self._frame = None
+
+    def entry_added(self, entry: Dict) -> None:
+        recipe_id = int(entry['recipe_id'])
+        self._counts[recipe_id] += 1
+        self._apply(recipe_id, 1)
+
+    def entry_removed(self, entry: Dict) -> None:
+        recipe_id = int(entry['recipe_id'])
+        self._counts[recipe_id] -= 1
+        if not self._counts[recipe_id]:
+            del self._counts[recipe_id]
+        self._apply(recipe_id, -1)
+
+    def cleared(self) -> None:
+        self._counts.clear()
+        self._required.clear()
+        self._frame = None
+
+    def iter_items(self) -> Iterator[Dict]:
+        """
+        Yield items still to buy as dicts with SHOPPING_LIST_COLUMNS, by aisle then name.
+
+        The rows are taken from a snapshot of the list, since a deferred export can
+        run while plan changes are still updating it.
+        """
+        rows = []
+        stock = self._stock
+        for key, required in list(self._required.items()):
+            in_stock = stock.get(key, 0.0)
+            if required - in_stock > 1e-9:
+                name, aisle = self._items[key]
+                rows.append((aisle, name, key[1], required, in_stock))
+        rows.sort(key=lambda row: (row[0], row[1], row[2]))
+        for aisle, name, unit, required, in_stock in rows:
+            yield {
+                'aisle': aisle,
+                'name': name,
+                'unit': unit,
+                'required': required,
+                'in_stock': in_stock,
+                'to_buy': required - in_stock
+            }
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Items to buy as a DataFrame with SHOPPING_LIST_COLUMNS, rebuilt only after changes."""
+        if self._frame is None:
+            self._frame = pd.DataFrame(list(self.iter_items()), columns=SHOPPING_LIST_COLUMNS)
+        return self._frame
+
+    @property
+    def empty(self) -> bool:
+        return self.to_dataframe().empty
+
+    def write_csv(self, fp: TextIO) -> None:
+        """Write the list as CSV to `fp` one row at a time."""
+        writer = csv.DictWriter(fp, fieldnames=SHOPPING_LIST_COLUMNS)
+        writer.writeheader()
+        for row in self.iter_items():
+            writer.writerow({**row, 'required': f"{row['required']:g}", 'in_stock': f"{row['in_stock']:g}",
+                             'to_buy': f"{row['to_buy']:g}"})
+
+    def write_markdown(self, fp: TextIO) -> None:
+        """Write the list as a Markdown checklist to `fp`, one section per aisle."""
+        fp.write("# Shopping list\n")
+        aisle = None
+        for row in self.iter_items():
+            if row['aisle'] != aisle:
+                aisle = row['aisle']
+                fp.write(f"\n## {aisle}\n\n")
+            fp.write(f"- [ ] {row['to_buy']:g} {row['unit']} {row['name']}\n")
+
+    def export(self, fmt: str) -> io.BytesIO:
+        """
+        Stream the list in 'csv' or 'markdown' format into a UTF-8 bytes buffer,
+        suitable as a deferred st.download_button payload.
+        """
+        writers = {'csv': self.write_csv, 'markdown': self.write_markdown}
+        if fmt not in writers:
+            raise ValueError(f"Unknown export format: {fmt}")
+        buffer = io.BytesIO()
+        text = io.TextIOWrapper(buffer, encoding='utf-8', newline='')
+        writers[fmt](text)
+        text.flush()
+        text.detach()
+        buffer.seek(0)
+        return buffer
@@ -1,18 +1,136 @@
+from __future__ import annotations
 import requests
-import pandas as pd
 import os
-from typing import Dict, List, Optional, Tuple
-from dotenv import load_dotenv
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from services.cache import SearchCache
+from utils.defaults import (HTTP_POOL_SIZE, HTTP_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR,
+                            HTTP_BACKOFF_MAX, HTTP_RETRY_STATUSES, SEARCH_PAGE_SIZE, SEARCH_MAX_CONCURRENCY)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# nutrition_df column -> lowercased Spoonacular nutrient name
+NUTRIENT_COLUMNS = {
+    'calories': 'calories',
+    'protein': 'protein',
+    'carbs': 'carbohydrates',
+    'fat': 'fat',
+    'fiber': 'fiber',
+    'sugar': 'sugar',
+    'sodium': 'sodium',
+    'cholesterol': 'cholesterol'
+}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """
+    Return the process-wide pooled HTTP session.
+
+    The session keeps connections alive between calls and is shared by every
+    SpoonacularAPI instance, so Streamlit sessions reuse the same TCP/TLS pool.
+    Retries are handled by SpoonacularAPI itself, not by the adapter.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+class SpoonacularAPIError(Exception):
+    """Raised when a Spoonacular request fails, as opposed to returning no results."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, attempts: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.attempts = attempts
+
 
 class SpoonacularAPI:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[SearchCache] = None,
+                 session: Optional[requests.Session] = None, timeout: Tuple[float, float] = HTTP_TIMEOUT,
+                 max_retries: int = HTTP_MAX_RETRIES, backoff_factor: float = HTTP_BACKOFF_FACTOR):
         # Load environment variables from .env file
+        from dotenv import load_dotenv
         load_dotenv()
         
         self.api_key = api_key or os.getenv('SPOONACULAR_API_KEY')
         if not self.api_key:
             raise ValueError("SPOONACULAR_API_KEY not found in environment variables")
         self.base_url = "https://api.spoonacular.com"
+        self.cache = cache if cache is not None else SearchCache()
+        self.session = session if session is not None else get_session()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Seconds to wait before the next attempt: Retry-After if given, else exponential backoff with full jitter."""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(HTTP_BACKOFF_MAX, self.backoff_factor * (2 ** attempt)))
+
+    def _get(self, endpoint: str, params: Dict) -> requests.Response:
+        """
+        GET through the pooled session, retrying connection errors and retryable statuses.
+
+        Raises:
+            SpoonacularAPIError: if the request still fails after all retries, or the
+                server asks us to wait longer than HTTP_BACKOFF_MAX.
+        """
+        attempts = self.max_retries + 1
+        for attempt in range(attempts):
+            response = None
+            try:
+                response = self.session.get(endpoint, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == attempts - 1:
+                    raise SpoonacularAPIError(f"Spoonacular request failed: {e}", attempts=attempt + 1) from e
+            else:
+                if response.status_code == 200:
+                    if attempt > 0:
+                        logger.warning("Spoonacular request succeeded after %d attempts", attempt + 1)
+                    return response
+                if response.status_code not in HTTP_RETRY_STATUSES or attempt == attempts - 1:
+                    raise SpoonacularAPIError(
+                        f"Spoonacular returned HTTP {response.status_code} after {attempt + 1} attempt(s)",
+                        status_code=response.status_code,
+                        attempts=attempt + 1
+                    )
+
+            delay = self._retry_delay(attempt, response)
+            if delay > HTTP_BACKOFF_MAX:
+                raise SpoonacularAPIError(
+                    f"Spoonacular asked to retry after {delay:.0f}s",
+                    status_code=response.status_code if response is not None else None,
+                    attempts=attempt + 1
+                )
+            time.sleep(delay)
 
     def find_nutrient(self, nutrients: List[Dict], nutrient_name: str) -> float:
         """Helper function to extract nutrient value from nutrients list"""
@@ -27,75 +145,76 @@ class SpoonacularAPI:
         - recipes_df: Basic recipe information
         - ingredients_df: Detailed ingredients information
         - nutrition_df: Nutritional information
+
+        Each DataFrame is built directly from column arrays with explicit numeric dtypes,
+        and each recipe's nutrient list is scanned once into a name lookup. Ingredient
+        ids are nullable (Int64), since Spoonacular sends null for some ingredients;
+        recipes without servings cannot be costed or saved and are skipped.
         """
+        import numpy as np
+        import pandas as pd
+
+        skipped = [recipe.get('id') for recipe in recipes_data if recipe.get('servings') is None]
+        if skipped:
+            logger.warning("Skipping recipes without servings: %s", skipped)
+            recipes_data = [recipe for recipe in recipes_data if recipe.get('servings') is not None]
         if not recipes_data:
             return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
         # Process basic recipe information
-        recipes_list = []
-        ingredients_list = []
-        nutrition_list = []
-
-        for recipe in recipes_data:
-            # Basic recipe information
-            recipe_basic = {
-                'recipe_id': recipe['id'],
-                'name': recipe['title'],
-                'servings': recipe['servings'],
-                'prep_time': recipe.get('readyInMinutes', 0),
-                'total_cost': recipe.get('pricePerServing', 0) * recipe['servings'],
-                'source_url': recipe.get('sourceUrl', ''),
-                'image_url': recipe.get('image', '')
-            }
-            recipes_list.append(recipe_basic)
-
-            # Process ingredients
-            for ingredient in recipe['extendedIngredients']:
-                ingredient_data = {
-                    'recipe_id': recipe['id'],
-                    'ingredient_id': ingredient.get('id', 0),
-                    'name': ingredient.get('name', ''),
-                    'amount': ingredient.get('amount', 0),
-                    'unit': ingredient.get('unit', ''),
-                    'original_string': ingredient.get('original', ''),
-                    'aisle': ingredient.get('aisle', '')
-                }
-                ingredients_list.append(ingredient_data)
-
-            # Process nutrition
-            if 'nutrition' in recipe:
-                nutrients = recipe['nutrition'].get('nutrients', [])
-                nutrition_data = {
-                    'recipe_id': recipe['id'],
-                    'calories': self.find_nutrient(nutrients, 'Calories'),
-                    'protein': self.find_nutrient(nutrients, 'Protein'),
-                    'carbs': self.find_nutrient(nutrients, 'Carbohydrates'),
-                    'fat': self.find_nutrient(nutrients, 'Fat'),
-                    'fiber': self.find_nutrient(nutrients, 'Fiber'),
-                    'sugar': self.find_nutrient(nutrients, 'Sugar'),
-                    'sodium': self.find_nutrient(nutrients, 'Sodium'),
-                    'cholesterol': self.find_nutrient(nutrients, 'Cholesterol')
-                }
-                nutrition_list.append(nutrition_data)
+        recipe_ids = np.array([recipe['id'] for recipe in recipes_data], dtype='int64')
+        servings = np.array([recipe['servings'] for recipe in recipes_data], dtype='int64')
+        recipes_df = pd.DataFrame(
+            {
+                'name': [recipe['title'] for recipe in recipes_data],
+                'servings': servings,
+                'prep_time': np.array([recipe.get('readyInMinutes', 0) for recipe in recipes_data], dtype='int64'),
+                'total_cost': np.array([recipe.get('pricePerServing', 0) for recipe in recipes_data], dtype='float64') * servings,
+                'source_url': [recipe.get('sourceUrl', '') for recipe in recipes_data],
+                'image_url': [recipe.get('image', '') for recipe in recipes_data]
+            },
+            index=pd.Index(recipe_ids, name='recipe_id')
+        )
 
-        # Create DataFrames
-        recipes_df = pd.DataFrame(recipes_list)
-        ingredients_df = pd.DataFrame(ingredients_list)
-        nutrition_df = pd.DataFrame(nutrition_list)
+        # Process ingredients
+        ingredient_lists = [recipe['extendedIngredients'] for recipe in recipes_data]
+        ingredients = [ingredient for ingredient_list in ingredient_lists for ingredient in ingredient_list]
+        if ingredients:
+            ingredients_df = pd.DataFrame({
+                'recipe_id': np.repeat(recipe_ids, [len(ingredient_list) for ingredient_list in ingredient_lists]),
+                'ingredient_id': pd.array([ingredient.get('id', 0) for ingredient in ingredients], dtype='Int64'),
+                'name': [ingredient.get('name', '') for ingredient in ingredients],
+                'amount': np.array([ingredient.get('amount', 0) for ingredient in ingredients], dtype='float64'),
+                'unit': [ingredient.get('unit', '') for ingredient in ingredients],
+                'original_string': [ingredient.get('original', '') for ingredient in ingredients],
+                'aisle': [ingredient.get('aisle', '') for ingredient in ingredients]
+            })
+        else:
+            ingredients_df = pd.DataFrame()
 
-        # Set index
-        if not recipes_df.empty:
-            recipes_df.set_index('recipe_id', inplace=True)
-        if not nutrition_df.empty:
-            nutrition_df.set_index('recipe_id', inplace=True)
+        # Process nutrition
+        with_nutrition = [recipe for recipe in recipes_data if 'nutrition' in recipe]
+        if with_nutrition:
+            columns = {column: np.zeros(len(with_nutrition), dtype='float64') for column in NUTRIENT_COLUMNS}
+            for row, recipe in enumerate(with_nutrition):
+                # Reversed so the first entry wins for duplicate names, as in find_nutrient
+                amounts = {
+                    nutrient.get('name', '').lower(): nutrient.get('amount', 0)
+                    for nutrient in reversed(recipe['nutrition'].get('nutrients', []))
+                }
+                for column, nutrient_name in NUTRIENT_COLUMNS.items():
+                    columns[column][row] = amounts.get(nutrient_name, 0.0)
+            nutrition_df = pd.DataFrame(
+                columns,
+                index=pd.Index(np.array([recipe['id'] for recipe in with_nutrition], dtype='int64'), name='recipe_id')
+            )
+        else:
+            nutrition_df = pd.DataFrame()
 
         return recipes_df, ingredients_df, nutrition_df
 
-    def search_recipes(self,query: str, ingredients: str, nutrition_goals, max_ready_time: int, sort: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-
-
-        endpoint = f"{self.base_url}/recipes/complexSearch"
-        params = {
+    def _search_params(self, query: str, ingredients: str, nutrition_goals, number: int, offset: int, sort: str) -> Dict:
+        return {
             "query": query,
             "ingredients": ingredients,
             "fillIngredients": True,
@@ -111,19 +230,114 @@ class SpoonacularAPI:
             "maxFiber": nutrition_goals['fiber'][1],
             "minSugar": nutrition_goals['sugar'][0],
             "maxSugar": nutrition_goals['sugar'][1],
-            "number": 5,
+            "number": number,
+            "offset": offset,
             "addRecipeInformation": True,
             "addRecipeNutrition": True,
             "instructionsRequired": True,
             "sort": sort,
             "apiKey": self.api_key
         }
-        
-        response = requests.get(endpoint, params=params)
-        
-        if response.status_code == 200:
-            results = response.json()["results"]
-            # Convert API response to DataFrames
-            recipes_df, ingredients_df, nutrition_df = self.parse_recipe_data(results)
-            return recipes_df, ingredients_df, nutrition_df
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+    def _fetch_page(self, params: Dict) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        response = self._get(f"{self.base_url}/recipes/complexSearch", params)
+        results = response.json()["results"]
+        # Convert API response to DataFrames
+        return self.parse_recipe_data(results)
+
+    @staticmethod
+    def merge_pages(pages: List[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Merge parsed result pages into a single (recipes_df, ingredients_df, nutrition_df) triple.
+
+        Recipes are deduplicated by recipe id, keeping the first page a recipe appears on,
+        and only that page's ingredient and nutrition rows are kept for it.
+        """
+        import pandas as pd
+
+        seen = set()
+        recipes, ingredients, nutrition = [], [], []
+        for recipes_df, ingredients_df, nutrition_df in pages:
+            if recipes_df.empty:
+                continue
+            new_ids = recipes_df.index[~recipes_df.index.isin(seen)]
+            seen.update(new_ids)
+            recipes.append(recipes_df.loc[new_ids])
+            if not ingredients_df.empty:
+                ingredients.append(ingredients_df[ingredients_df['recipe_id'].isin(new_ids)])
+            if not nutrition_df.empty:
+                nutrition.append(nutrition_df[nutrition_df.index.isin(new_ids)])
+
+        if not recipes:
+            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        return (
+            pd.concat(recipes),
+            pd.concat(ingredients, ignore_index=True) if ingredients else pd.DataFrame(),
+            pd.concat(nutrition) if nutrition else pd.DataFrame()
+        )
+
+    def iter_search_pages(self, query: str, ingredients: str, nutrition_goals, sort: str, number: int,
+                          page_size: int = SEARCH_PAGE_SIZE, max_workers: int = SEARCH_MAX_CONCURRENCY
+                          ) -> Iterator[Tuple[int, Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]]]:
+        """
+        Fetch `number` results as offset-paginated complexSearch calls issued concurrently.
+
+        Yields (offset, (recipes_df, ingredients_df, nutrition_df)) for each page in
+        completion order, so callers can use early pages before the last one lands.
+        At most `max_workers` requests are in flight at once.
+        """
+        offsets = range(0, number, page_size)
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(offsets))))
+        try:
+            futures = {
+                executor.submit(
+                    self._fetch_page,
+                    self._search_params(query, ingredients, nutrition_goals, min(page_size, number - offset), offset, sort)
+                ): offset
+                for offset in offsets
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def search_recipes(self, query: str, ingredients: str, nutrition_goals, max_ready_time: int, sort: str,
+                       use_cache: bool = True, number: int = 5,
+                       on_page: Optional[Callable[[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]], None]] = None
+                       ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Search complexSearch and return parsed (recipes_df, ingredients_df, nutrition_df).
+
+        Identical searches are answered from the local search cache; pass
+        use_cache=False to bypass it and force a network request.
+
+        When `number` exceeds one page, pages are fetched concurrently and merged.
+        If given, `on_page` is called with the merged results so far each time a
+        page arrives.
+
+        Raises:
+            SpoonacularAPIError: if the request fails after retries. An empty result
+                set is returned as empty DataFrames, never as an error.
+        """
+        cache_key = self.cache.make_key({
+            'query': query,
+            'ingredients': ingredients,
+            'nutrition_goals': nutrition_goals,
+            'max_ready_time': max_ready_time,
+            'sort': sort,
+            'number': number
+        })
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        pages = {}
+        for offset, page in self.iter_search_pages(query, ingredients, nutrition_goals, sort, number):
+            pages[offset] = page
+            if on_page is not None:
+                on_page(self.merge_pages([pages[key] for key in sorted(pages)]))
+
+        results = self.merge_pages([pages[key] for key in sorted(pages)])
+        self.cache.set(cache_key, results)
+        return results
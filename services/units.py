@@ -0,0 +1,177 @@
+import re
+from typing import Dict, Mapping, Optional
+import numpy as np
+import pandas as pd
+from services.ingredient_names import normalize_ingredient_name
+
+# Canonical unit per dimension; every known unit converts to one of these
+CANONICAL_UNITS = {'mass': 'g', 'volume': 'ml', 'count': 'piece'}
+
+# unit -> (dimension, size in the dimension's canonical unit)
+UNITS: Dict[str, tuple] = {
+    'mg': ('mass', 0.001),
+    'g': ('mass', 1.0),
+    'kg': ('mass', 1000.0),
+    'oz': ('mass', 28.349523125),
+    'lb': ('mass', 453.59237),
+    'ml': ('volume', 1.0),
+    'cl': ('volume', 10.0),
+    'dl': ('volume', 100.0),
+    'l': ('volume', 1000.0),
+    'tsp': ('volume', 4.92892159375),
+    'tbsp': ('volume', 14.78676478125),
+    'fl oz': ('volume', 29.5735295625),
+    'cup': ('volume', 236.5882365),
+    'pint': ('volume', 473.176473),
+    'quart': ('volume', 946.352946),
+    'gallon': ('volume', 3785.411784),
+    'piece': ('count', 1.0),
+    'dozen': ('count', 12.0),
+}
+
+# Spellings seen in the pantry form and in Spoonacular payloads, lowercased
+UNIT_ALIASES: Dict[str, str] = {
+    'milligram': 'mg', 'milligrams': 'mg',
+    'gram': 'g', 'grams': 'g', 'gr': 'g',
+    'kilogram': 'kg', 'kilograms': 'kg', 'kgs': 'kg',
+    'ounce': 'oz', 'ounces': 'oz',
+    'pound': 'lb', 'pounds': 'lb', 'lbs': 'lb',
+    'milliliter': 'ml', 'milliliters': 'ml', 'millilitre': 'ml', 'millilitres': 'ml', 'mls': 'ml',
+    'centiliter': 'cl', 'deciliter': 'dl',
+    'liter': 'l', 'liters': 'l', 'litre': 'l', 'litres': 'l',
+    'teaspoon': 'tsp', 'teaspoons': 'tsp', 'tsps': 'tsp', 't': 'tsp',
+    'tablespoon': 'tbsp', 'tablespoons': 'tbsp', 'tbsps': 'tbsp', 'tbs': 'tbsp', 'tb': 'tbsp',
+    'fluid ounce': 'fl oz', 'fluid ounces': 'fl oz', 'fl. oz': 'fl oz', 'floz': 'fl oz',
+    'cups': 'cup', 'c': 'cup',
+    'pints': 'pint', 'pt': 'pint',
+    'quarts': 'quart', 'qt': 'quart',
+    'gallons': 'gallon', 'gal': 'gallon',
+    'pieces': 'piece', 'pc': 'piece', 'pcs': 'piece', 'whole': 'piece', 'each': 'piece',
+    'small': 'piece', 'medium': 'piece', 'large': 'piece', '': 'piece',
+}
+
+# Grams per millilitre for common ingredients, matched on normalize_ingredient_name
+DENSITIES: Dict[str, float] = {
+    'water': 1.0,
+    'milk': 1.03,
+    'heavy cream': 1.01,
+    'yogurt': 1.03,
+    'butter': 0.911,
+    'olive oil': 0.91,
+    'vegetable oil': 0.92,
+    'honey': 1.42,
+    'maple syrup': 1.32,
+    'soy sauce': 1.16,
+    'flour': 0.53,
+    'all purpose flour': 0.53,
+    'sugar': 0.85,
+    'brown sugar': 0.83,
+    'powdered sugar': 0.56,
+    'salt': 1.2,
+    'rice': 0.85,
+    'oats': 0.41,
+    'cocoa powder': 0.42,
+    'peanut butter': 1.09,
+}
+
+
+def normalize_unit(unit) -> Optional[str]:
+    """Map a unit spelling to a key of UNITS, or None if it is not convertible."""
+    if pd.isna(unit):
+        return 'piece'
+    # Recipe text uses a capital T for tablespoon and a lowercase t for teaspoon
+    if str(unit).strip() == 'T':
+        return 'tbsp'
+    key = re.sub(r'\s+', ' ', str(unit).strip().lower())
+    key = UNIT_ALIASES.get(key, key)
+    return key if key in UNITS else None
+
+
+def _unit_table(units: pd.Series) -> tuple:
+    """Per-row (dimension, factor, canonical unit) arrays, resolving each distinct spelling once."""
+    codes, uniques = pd.factorize(units, use_na_sentinel=False)
+    normalized = [normalize_unit(unit) for unit in uniques]
+    dimensions = np.array([UNITS[unit][0] if unit else None for unit in normalized], dtype=object)
+    factors = np.array([UNITS[unit][1] if unit else np.nan for unit in normalized], dtype='float64')
+    canonical = np.array([CANONICAL_UNITS.get(dimension) for dimension in dimensions], dtype=object)
+    return dimensions[codes], factors[codes], canonical[codes]
+
+
+def _densities(names: Optional[pd.Series], densities: Optional[Mapping[str, float]], length: int) -> np.ndarray:
+    """Per-row density in g/ml, NaN where unknown."""
+    if names is None:
+        return np.full(length, np.nan)
+    table = {normalize_ingredient_name(name): value for name, value in DENSITIES.items()}
+    if densities:
+        table.update({normalize_ingredient_name(name): value for name, value in densities.items()})
+    codes, uniques = pd.factorize(names, use_na_sentinel=False)
+    return np.array([table.get(normalize_ingredient_name(name), np.nan) for name in uniques], dtype='float64')[codes]
+
+
+def convert_amounts(amounts: pd.Series, units: pd.Series, target_unit: str, names: Optional[pd.Series] = None,
+                    densities: Optional[Mapping[str, float]] = None) -> pd.Series:
+    """
+    Convert a column of amounts to `target_unit` in one pass.
+
+    Mass and volume convert into each other through the ingredient's density,
+    looked up by name in DENSITIES updated with `densities`. Rows that can't be
+    converted (unknown unit, other dimension, no density) come back as NaN.
+
+    Args:
+        amounts: Quantities
+        units: Unit per quantity, in any spelling normalize_unit accepts
+        target_unit: Unit to convert to
+        names: Ingredient names, needed for mass <-> volume conversion
+        densities: Extra or overriding densities in g/ml by ingredient name
+
+    Returns:
+        pd.Series: Converted amounts, aligned with `amounts`
+    """
+    target = normalize_unit(target_unit)
+    if target is None:
+        raise ValueError(f"Unknown unit: {target_unit}")
+    target_dimension, target_factor = UNITS[target]
+
+    dimensions, factors, _ = _unit_table(units)
+    base = amounts.to_numpy(dtype='float64', na_value=np.nan) * factors
+    result = np.where(dimensions == target_dimension, base, np.nan)
+
+    if target_dimension in ('mass', 'volume'):
+        density = _densities(names, densities, len(amounts))
+        if target_dimension == 'mass':
+            result = np.where(dimensions == 'volume', base * density, result)
+        else:
+            result = np.where(dimensions == 'mass', base / density, result)
+    return pd.Series(result / target_factor, index=amounts.index, name=amounts.name)
+
+
+def canonicalize(df: pd.DataFrame, amount_col: str = 'amount', unit_col: str = 'unit', name_col: Optional[str] = 'name',
+                 densities: Optional[Mapping[str, float]] = None, prefer_mass: bool = True) -> pd.DataFrame:
+    """
+    Convert every row of `df` to its dimension's canonical unit (g, ml or piece).
+
+    With prefer_mass, volumes of ingredients with a known density become grams so
+    they can be summed with weighed pantry items. Unconvertible rows keep their
+    original amount and unit.
+
+    Returns:
+        pd.DataFrame: A copy of df with amount_col and unit_col replaced, plus a
+            boolean 'converted' column
+    """
+    names = df[name_col] if name_col and name_col in df else None
+    dimensions, factors, canonical = _unit_table(df[unit_col])
+    amounts = df[amount_col].to_numpy(dtype='float64', na_value=np.nan)
+    base = amounts * factors
+
+    if prefer_mass:
+        density = _densities(names, densities, len(df))
+        to_mass = (dimensions == 'volume') & ~np.isnan(density)
+        base = np.where(to_mass, base * density, base)
+        canonical = np.where(to_mass, 'g', canonical)
+
+    converted = ~np.isnan(factors)
+    result = df.copy()
+    result[amount_col] = np.where(converted, base, amounts)
+    result[unit_col] = np.where(converted, canonical, df[unit_col].to_numpy(dtype=object))
+    result['converted'] = converted
+    return result
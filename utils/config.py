@@ -1,25 +1,67 @@
+from typing import TYPE_CHECKING
 import streamlit as st
 from services.database import Database
-import pandas as pd
+from services.expiry_index import expiry_index, ExpiryIndex
+from services.read_cache import cached_reads, CachedReads
+
+# Keep this module light: every page imports it, so pandas/numpy/requests are only
+# loaded by the pages and functions that need them (see benchmarks/importtime.py)
+if TYPE_CHECKING:
+    from services.image_cache import ImageCache
+    from services.spoonacular import SpoonacularAPI
+
+
+@st.cache_resource
+def get_database() -> Database:
+    """The process-wide Database, opened (and migrated) once rather than per session."""
+    return Database()
+
+
+@st.cache_resource
+def get_api() -> 'SpoonacularAPI':
+    """The process-wide Spoonacular client, sharing one HTTP session and search cache."""
+    from services.spoonacular import SpoonacularAPI
+    return SpoonacularAPI()
+
+
+@st.cache_resource
+def get_image_cache() -> 'ImageCache':
+    """The process-wide recipe thumbnail cache."""
+    from services.image_cache import ImageCache
+    return ImageCache()
+
+
+def get_reads() -> CachedReads:
+    """Cached reads over the session's Database, shared with every session using it."""
+    return cached_reads(st.session_state.db)
+
+
+def get_expiry_index() -> ExpiryIndex:
+    """Pantry expiry index over the session's Database, shared and kept in sync with every session using it."""
+    return expiry_index(st.session_state.db)
+
 
 def initialize_session_state():
     """Initialize Streamlit session state variables."""
     if 'db' not in st.session_state:
-        st.session_state.db = Database()
+        st.session_state.db = get_database()
     if 'search_results' not in st.session_state:
         st.session_state.search_results = None
     if 'selected_recipe' not in st.session_state:
         st.session_state.selected_recipe = None
+
+
+def initialize_planning_state():
+    """Initialize the meal plan and its listeners, used by the Meal Planning page."""
+    from models.meal_plan_buffer import MealPlanBuffer
+    from services.nutrition_aggregator import NutritionAggregator
+    from services.shopping_list import ShoppingList
+
     if 'meal_plan' not in st.session_state:
-        columns = ['date', 'num_days', 'meal_type', 'recipe_id', 'recipe_name']
-        st.session_state.meal_plan = pd.DataFrame(columns=columns)
-    if 'meal_plan_recipes' not in st.session_state:
-        columns = ['recipe_id', 'recipe_name', 'servings', 'prep_time', 'total_cost', 'source_url', 'image_url']
-        st.session_state.meal_plan_recipes = pd.DataFrame(columns=columns)
-    if 'meal_plan_ingredients' not in st.session_state:
-        columns = ['recipe_id', 'ingredient_id', 'name', 'amount', 'unit', 'expiry_date', 'original_string', 'aisle']
-        st.session_state.meal_plan_ingredients = pd.DataFrame(columns=columns)
-    if 'meal_plan_nutrition' not in st.session_state:
-        columns = ['recipe_id', 'calories', 'protein', 'carbs', 'fiber', 'sodium', 'sugar', 'fat', 'cholesterol']
-        st.session_state.meal_plan_nutrition = pd.DataFrame(columns=columns)
-        
+        st.session_state.meal_plan = MealPlanBuffer()
+    if 'nutrition_totals' not in st.session_state:
+        st.session_state.nutrition_totals = NutritionAggregator()
+        st.session_state.meal_plan.add_listener(st.session_state.nutrition_totals)
+    if 'shopping_list' not in st.session_state:
+        st.session_state.shopping_list = ShoppingList()
+        st.session_state.meal_plan.add_listener(st.session_state.shopping_list)
@@ -10,4 +10,48 @@ MAX_FAT = 2000
 MIN_FIBER = 0
 MAX_FIBER = 2000
 MIN_SUGAR = 0
-MAX_SUGAR = 2000    
\ No newline at end of file
+MAX_SUGAR = 2000    
+
+# Recipe search cache (lives next to meal_prep.db)
+SEARCH_CACHE_PATH = "search_cache.db"
+SEARCH_CACHE_TTL_SECONDS = 6 * 60 * 60
+SEARCH_CACHE_MAX_ENTRIES = 200
+
+# Spoonacular HTTP client
+HTTP_POOL_SIZE = 10
+HTTP_TIMEOUT = (3.05, 15)  # (connect, read) seconds
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_BACKOFF_MAX = 10  # Give up rather than wait longer than this between attempts
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# complexSearch pagination
+SEARCH_PAGE_SIZE = 25  # Spoonacular allows up to 100 results per request
+SEARCH_MAX_CONCURRENCY = 4
+SEARCH_RESULT_COUNTS = [5, 10, 25, 50, 100]
+RESULTS_PAGE_SIZE = 12  # Recipe tiles rendered per page of search results (a multiple of the 3 grid columns)
+
+# SQLite connection pragmas applied to every Database connection (journal_mode is always WAL)
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',  # Safe with WAL; skips the fsync on every commit
+    'cache_size': -16000,  # Negative values are KiB, so ~16 MB of page cache
+    'mmap_size': 64 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+SQLITE_POOL_SIZE = 4  # Idle connections kept open per Database
+READ_CACHE_MAX_ENTRIES = 64  # Cached read results kept per Database across reruns
+PLAN_HISTORY_PAGE_SIZE = 10  # Saved plans listed per "Load more" on the User Dashboard
+
+# Fridge inventory
+EXPIRY_WARNING_DAYS = 3
+EXPIRY_PRIORITY_DAYS = 7  # Stock expiring within this many days boosts recipes that use it
+EXPIRY_WEIGHT = 5.0  # Optimizer credit per unit of expiry urgency, in the same units as cost ($)
+
+# Recipe image thumbnails (served to tiles from disk rather than the Spoonacular CDN)
+IMAGE_CACHE_DIR = "image_cache"
+IMAGE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+IMAGE_THUMBNAIL_SIZE = (300, 200)  # Matches the .recipe-tile width
+IMAGE_DETAIL_SIZE = (636, 393)  # Spoonacular's largest recipe image size
+IMAGE_FETCH_CONCURRENCY = 4
+IMAGE_FAILURE_TTL_SECONDS = 5 * 60  # Don't retry a failed image download for this long
+IMAGE_INDEX_TIMEOUT_SECONDS = 10  # How long a prefetch worker waits for another to finish writing index.db
@@ -52,4 +52,11 @@ RECIPE_TILE_STYLE = """
             color: white;
         }
         </style>
-    """
\ No newline at end of file
+    """
+# Shown in recipe tiles when a recipe has no image or it could not be cached
+PLACEHOLDER_IMAGE = (
+    "<svg xmlns='http://www.w3.org/2000/svg' width='300' height='200'>"
+    "<rect width='100%' height='100%' fill='#eeeeee'/>"
+    "<text x='50%' y='50%' fill='#999999' font-family='sans-serif' font-size='20' "
+    "text-anchor='middle' dominant-baseline='middle'>No Image</text></svg>"
+)